@@ -77,9 +77,19 @@ def solve(instance: PBInstance):
     # Examples:
     # - solver.solve(PBAlgorithm.GREEDY, PBWelfare.UTILITARIAN)
     # - solver.solve(PBAlgorithm.SIMULATED_ANNEALING, PBWelfare.UTILITARIAN)
+    # - solver.solve(PBAlgorithm.PARALLEL_TEMPERING, PBWelfare.UTILITARIAN)
     # - solver.solve(PBAlgorithm.GENETIC_ALGORITHM, PBWelfare.UTILITARIAN)
     # - solver.solve(PBAlgorithm.DYNAMIC_PROGRAMMING, PBWelfare.UTILITARIAN)
     # - solver.solve(PBAlgorithm.BRANCH_AND_BOUND, PBWelfare.UTILITARIAN)
+    # - solver.solve(PBAlgorithm.PARETO_FRONTIER, PBWelfare.UTILITARIAN)
+    # - solver.solve(PBAlgorithm.FPTAS, PBWelfare.UTILITARIAN, epsilon=0.05)
+    # - solver.solve(PBAlgorithm.PORTFOLIO, PBWelfare.UTILITARIAN, time_limit_ms=1_000)
+    # - solver.solve(PBAlgorithm.AUTO, PBWelfare.UTILITARIAN, time_limit_ms=1_000)
+    # - solver.solve_budgets([8_000, 9_000, 10_000], PBAlgorithm.DYNAMIC_PROGRAMMING, PBWelfare.UTILITARIAN)
+    # - solver.solve('GENETIC_ALGORITHM', PBWelfare.UTILITARIAN, options={'population_size': 500})
+    # - PBSolver(instance, cache=PBResultCache(max_size=128, path='.pybudgie-cache')).solve(...)
+    # - await solver.solve_async(PBAlgorithm.SIMULATED_ANNEALING, PBWelfare.UTILITARIAN, executor='process')
+    # - async for result in solver.solve_stream(PBAlgorithm.BRANCH_AND_BOUND, PBWelfare.UTILITARIAN): ...
 
 
 def main():
@@ -1,5 +1,6 @@
 from .instance import PBInstance
 from .project import PBProject
 from .voter import PBVoter
-from .solver import PBSolver, PBAlgorithm, PBWelfare
-from .result import PBResult
+from .solver import PBSolver, PBAlgorithm, PBWelfare, solve_many
+from .result import PBResult, PBSweepResult
+from .cache import PBResultCache
@@ -1,5 +1,38 @@
-from .greedy import greedy_solver, ratio_greedy_solver
-from .sim_anneal import simulated_annealing_solver
-from .genetic import genetic_algorithm_solver
-from .dyn_prog import dynamic_programming_solver
-from .branch_bound import branch_and_bound_solver
+from .deadline import Deadline
+from typing import Dict, List
+import importlib
+
+
+# The module of each solver, which is only imported the first time
+# the solver is accessed, such that, e.g., NumPy is only imported
+# once an algorithm that needs it is used:
+__modules: Dict[str, str] = {
+    'greedy_solver': '.greedy',
+    'ratio_greedy_solver': '.greedy',
+    'greedy_budget_sweep': '.greedy',
+    'simulated_annealing_solver': '.sim_anneal',
+    'parallel_tempering_solver': '.sim_anneal',
+    'genetic_algorithm_solver': '.genetic',
+    'dynamic_programming_solver': '.dyn_prog',
+    'min_cost_dynamic_programming_solver': '.dyn_prog',
+    'dynamic_programming_budget_sweep': '.dyn_prog',
+    'table_columns': '.dyn_prog',
+    'branch_and_bound_solver': '.branch_bound',
+    'pareto_frontier_solver': '.pareto',
+    'fptas_solver': '.fptas'
+}
+
+__all__: List[str] = ['Deadline', *__modules]
+
+
+def __getattr__(name: str):
+    if name not in __modules:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    solver = getattr(importlib.import_module(__modules[name], __name__), name)
+    globals()[name] = solver
+    return solver
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__modules))
@@ -1,6 +1,12 @@
+from .greedy import ratio_greedy_solver
+from .deadline import Deadline
 from dataclasses import dataclass
-from collections import deque
-from typing import Tuple, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, List, Dict, Optional, Callable
+import multiprocessing
+import bisect
+import heapq
+import math
 
 
 @dataclass
@@ -17,59 +23,306 @@ class AllocationNode:
     cost: int
     """The total cost on this path of the decision tree."""
 
-    allocation: List[int]
-    """The allocation found by this path in the decision tree."""
+    taken: Optional[tuple]
+    """The projects included on this path, as a linked list of (project, parent) pairs
+    which is shared with the parent node rather than copied."""
 
 
-def __bound(node: AllocationNode, budget: int, candidates: List[Tuple[int, int, int]]) -> float:
+def __unroll(taken: Optional[tuple]) -> List[int]:
+    """
+    Parameters:
+        - taken (Optional[tuple]): A linked list of (project, parent) pairs.
+
+    Returns:
+        - List[int]: The projects in the linked list, as a list of project ids.
+    """
+    allocation: List[int] = []
+    while taken is not None:
+        allocation.append(taken[0])
+        taken = taken[1]
+    return allocation
+
+
+def __bound(
+        node: AllocationNode,
+        budget: int,
+        candidates: List[Tuple[int, int, int]],
+        prefix_costs: List[int],
+        prefix_utilities: List[int],
+        tighter_bound: bool = False
+) -> int:
     """
     Computes the upper bound for an allocation node by relaxing the binary constraint, i.e.,
     such that fractions of items can be included in the allocation (fractional knapsack), and
     computing the maximum possible utility given the projects already in the allocation. An
     upper bound higher than the current utility implies a 'promising' node. We choose this
-    relaxation because it can exactly solve the (fractional knapsack) problem in linear time.
+    relaxation because it can exactly solve the (fractional knapsack) problem, and with the
+    prefix sums of the sorted candidates, the critical project (the first that does not fit)
+    is found with a single binary search. Since utilities are integers, the bound is rounded
+    down.
+
+    The tighter bound (Martello and Toth's U2) instead branches on the critical project: if
+    it is excluded, then the remaining budget is filled with the ratio of the next project;
+    if it is included, then some budget must be freed at the ratio of the previous project.
+    The larger of the two is never above the fractional bound, and so prunes more nodes.
 
     Parameters:
         - node (AllocationNode): A decision tree node for which to find the upper bound.
         - budget (int): The budget of the instance.
         - candidates (Tuple[int, int, int]): A sorted list of candidate tuples (id, utility, cost).
-    
+        - prefix_costs (List[int]): The prefix sums of the costs of the sorted candidates.
+        - prefix_utilities (List[int]): The prefix sums of the utilities of the sorted candidates.
+        - tighter_bound (bool): Whether to use Martello and Toth's U2 bound.
+
     Returns:
-        - float: The upper bound on the utility for this node.
+        - int: The upper bound on the utility for this node.
     """
 
-    # An invalid node or an exhausted budget
-    # means there is nothing to be done:
-    if node.cost >= budget:
+    # An invalid node means there is nothing to be done:
+    if node.cost > budget:
         return 0
-    
-    # Initialise values to search the remaining
-    # projects:
-    utility_bound: int = node.utility
+
+    # The projects {level + 1, ..., critical - 1} are the most
+    # that fit fully within the remaining budget:
     level: int = node.level + 1
-    cost: int = node.cost
-
-    # Add as many full projects as possible within
-    # the budget:
-    while level < len(candidates) and candidates[level][2] <= budget:
-        cost += candidates[level][2]
-        utility_bound += candidates[level][1]
-        level += 1
-    
-    # For the next project that is too expensive,
+    critical: int = bisect.bisect_right(prefix_costs, prefix_costs[level] + budget - node.cost) - 1
+    utility_bound: int = node.utility + prefix_utilities[critical] - prefix_utilities[level]
+    remaining: int = budget - node.cost - (prefix_costs[critical] - prefix_costs[level])
+
+    if critical == len(candidates):
+        return utility_bound
+
+    # For the critical project that is too expensive,
     # add as much of that project as possible:
-    if level < len(candidates):
-        utility_bound += (budget - cost) * \
-            candidates[level][1] / candidates[level][2]
-    
-    return utility_bound
+    _, utility, cost = candidates[critical]
+    if not tighter_bound:
+        return utility_bound + remaining * utility // cost
+
+    # U0: The critical project is excluded, so we fill the
+    # remaining budget at the ratio of the next project:
+    excluded_bound: int = utility_bound
+    if critical + 1 < len(candidates) and candidates[critical + 1][2] > 0:
+        excluded_bound += remaining * candidates[critical + 1][1] // candidates[critical + 1][2]
+
+    # U1: The critical project is included, so we remove just
+    # enough of the previous project to afford it:
+    included_bound: int = excluded_bound
+    if critical > level and candidates[critical - 1][2] > 0:
+        included_bound = utility_bound + math.floor(
+            utility - (cost - remaining) * candidates[critical - 1][1] / candidates[critical - 1][2]
+        )
+
+    return max(excluded_bound, included_bound)
+
+
+def __branch(
+        curr: AllocationNode,
+        budget: int,
+        candidates: List[Tuple[int, int, int]],
+        prefix_costs: List[int],
+        prefix_utilities: List[int],
+        tighter_bound: bool
+) -> Tuple[AllocationNode, AllocationNode]:
+    """
+    Generates the two children of a node in the decision tree, i.e., the nodes
+    including and excluding the next project, along with their upper bounds.
+
+    Parameters:
+        - curr (AllocationNode): The node to branch on.
+        - budget (int): The budget of the instance.
+        - candidates (Tuple[int, int, int]): A sorted list of candidate tuples (id, utility, cost).
+        - prefix_costs (List[int]): The prefix sums of the costs of the sorted candidates.
+        - prefix_utilities (List[int]): The prefix sums of the utilities of the sorted candidates.
+        - tighter_bound (bool): Whether to use Martello and Toth's U2 bound.
+
+    Returns:
+        - Tuple[AllocationNode, AllocationNode]: The included and excluded children.
+    """
+
+    level: int = curr.level + 1
+    project, utility, cost = candidates[level]
+
+    # Our first possible child considers the solution
+    # with the current project (level) included:
+    included: AllocationNode = AllocationNode(
+        level=level,
+        utility=curr.utility + utility,
+        bound=0,
+        cost=curr.cost + cost,
+        taken=(project, curr.taken)
+    )
+
+    # The upper bound gives the optimal solution for this
+    # child node if we can partially include the remaining
+    # items {level + 1, ..., n}. An over-budget child can
+    # never lead to a valid allocation:
+    if included.cost <= budget:
+        included.bound = __bound(included, budget, candidates, prefix_costs, prefix_utilities, tighter_bound)
+
+    # We repeat the process for a child node that does
+    # not include the current item (level):
+    excluded: AllocationNode = AllocationNode(
+        level=level,
+        utility=curr.utility,
+        bound=0,
+        cost=curr.cost,
+        taken=curr.taken
+    )
+    excluded.bound = __bound(excluded, budget, candidates, prefix_costs, prefix_utilities, tighter_bound)
+
+    return included, excluded
+
+
+def __search(
+        roots: List[AllocationNode],
+        budget: int,
+        candidates: List[Tuple[int, int, int]],
+        prefix_costs: List[int],
+        prefix_utilities: List[int],
+        max_utility: int,
+        max_taken: Optional[tuple],
+        max_queue_size: int,
+        tighter_bound: bool,
+        deadline: Deadline = None,
+        incumbent=None,
+        progress: Callable[[List[int], int], None] = None
+) -> Tuple[int, Optional[tuple], int, int]:
+    """
+    Searches the subtrees of the given nodes best-first, as described in
+    branch_and_bound_solver, and returns the best allocation found.
+
+    Parameters:
+        - roots (List[AllocationNode]): The nodes whose subtrees to search.
+        - budget (int): The budget of the instance.
+        - candidates (Tuple[int, int, int]): A sorted list of candidate tuples (id, utility, cost).
+        - prefix_costs (List[int]): The prefix sums of the costs of the sorted candidates.
+        - prefix_utilities (List[int]): The prefix sums of the utilities of the sorted candidates.
+        - max_utility (int): The utility of the incumbent allocation.
+        - max_taken (Optional[tuple]): The incumbent allocation, as a linked list.
+        - max_queue_size (int): The maximum number of nodes in the priority queue.
+        - tighter_bound (bool): Whether to use Martello and Toth's U2 bound.
+        - deadline (Deadline): An optional deadline, after which the incumbent is returned.
+        - incumbent (multiprocessing.Value): An optional utility shared between worker
+        processes. We periodically publish our best utility to it, and prune against
+        it whenever another worker has found a better allocation.
+        - progress (Callable[[List[int], int], None]): An optional function called with
+        each new best allocation, as a list of project ids, and its utility.
+
+    Returns:
+        - Tuple[int, Optional[tuple], int, int]: The utility and linked list of the best
+        allocation found, the number of expanded nodes, and the peak queue size.
+    """
+
+    # We prune against the threshold, which may come from another
+    # worker, but only ever return our own allocations:
+    threshold: int = max_utility
+
+    # The priority queue is ordered by the highest bound first, where
+    # the counter breaks ties such that nodes are never compared. The
+    # stack holds the nodes to be explored depth-first:
+    queue: List[Tuple[int, int, AllocationNode]] = [(-root.bound, i, root) for i, root in enumerate(roots)]
+    heapq.heapify(queue)
+    stack: List[AllocationNode] = []
+    counter: int = len(queue)
+    nodes: int = 0
+    peak_queue_size: int = len(queue)
+
+    # Each allocation node has a level attribute, which considers
+    # all projects in the project subset {1, ..., level}.
+    while queue or stack:
+        # Checking the clock and the shared incumbent is relatively
+        # expensive, so we only check them every so many nodes:
+        if nodes % 256 == 0:
+            if deadline is not None and deadline.expired():
+                break
+
+            if incumbent is not None:
+                with incumbent.get_lock():
+                    if threshold > incumbent.value:
+                        incumbent.value = threshold
+                    threshold = incumbent.value
+
+        curr: AllocationNode = stack.pop() if stack else heapq.heappop(queue)[2]
+
+        # The incumbent may have improved since this node was
+        # queued, in which case it is no longer promising:
+        if curr.bound <= threshold:
+            continue
+
+        # If the current level (project subset) considers
+        # all items, then nothing more is to be done:
+        if curr.level == len(candidates) - 1:
+            continue
+
+        nodes += 1
+        included, excluded = __branch(curr, budget, candidates, prefix_costs, prefix_utilities, tighter_bound)
+
+        # Update max_utility and max_taken if including this
+        # item yields the best allocation and utility so far:
+        if included.cost <= budget and included.utility > threshold:
+            max_utility = threshold = included.utility
+            max_taken = included.taken
+            if progress is not None:
+                progress(__unroll(max_taken), max_utility)
+
+        # If a child bound is larger than the threshold, then there
+        # is potential, so add it to the queue, or the stack if the
+        # queue is full. The included child is pushed last so that
+        # it is explored first on the stack:
+        for child in (excluded, included):
+            if child.bound <= threshold:
+                continue
+            if len(queue) < max_queue_size:
+                heapq.heappush(queue, (-child.bound, counter, child))
+                counter += 1
+            else:
+                stack.append(child)
+
+        peak_queue_size = max(peak_queue_size, len(queue) + len(stack))
+
+    return max_utility, max_taken, nodes, peak_queue_size
+
+
+# The instance data shared by the searches in a worker process,
+# which is set once by the pool initializer:
+__worker_state: tuple = ()
+
+
+def __init_worker(*state) -> None:
+    global __worker_state
+    __worker_state = state
+
+
+def __search_subtree(root: AllocationNode) -> Tuple[int, Optional[tuple], int, int]:
+    """
+    Searches a single subtree in a worker process, starting from the shared
+    incumbent utility.
+
+    Parameters:
+        - root (AllocationNode): The node whose subtree to search.
+
+    Returns:
+        - Tuple[int, Optional[tuple], int, int]: See __search.
+    """
+    budget, candidates, prefix_costs, prefix_utilities, \
+        max_queue_size, tighter_bound, deadline, incumbent = __worker_state
+    return __search(
+        [root], budget, candidates, prefix_costs, prefix_utilities,
+        incumbent.value, None, max_queue_size, tighter_bound, deadline, incumbent
+    )
 
 
 def branch_and_bound_solver(
         budget: int,
-        projects: List[int], 
+        projects: List[int],
         costs: List[int],
-        utilities: List[int]
+        utilities: List[int],
+        max_queue_size: int = 100_000,
+        tighter_bound: bool = False,
+        stats: Dict[str, int] = None,
+        deadline: Deadline = None,
+        workers: int = 1,
+        progress: Callable[[List[int], int], None] = None
 ) -> Tuple[List[int], int]:
     """
     An exact algorithm for participatory budgeting problems formulated as the
@@ -82,11 +335,36 @@ def branch_and_bound_solver(
     utility values. We stop expanding when we have no more nodes to expand
     or we have generated nodes for every item.
 
+    The search is best-first, i.e., we always expand the node with the highest
+    upper bound, and starts from the ratio greedy allocation as its incumbent,
+    such that poor subtrees are pruned from the very start. Once the priority
+    queue holds max_queue_size nodes, any further nodes are explored depth-first
+    instead, which needs at most two nodes per level, so the peak number of
+    queued nodes is bounded by max_queue_size + 2n.
+
+    With more than one worker, we split the decision tree at a shallow depth,
+    such that there are a few subtrees per worker, and search the subtrees in
+    a process pool. The workers share the utility of the best allocation found
+    so far, such that every worker prunes against the global incumbent. The
+    utility found is the same as the serial search, though ties between
+    allocations of equal utility may be broken differently.
+
     Parameters:
         - budget (int): The total budget of the instance.
         - projects (List[int]): A list of project identifiers.
         - costs (List[int]): A list of project costs.
         - utilities (List[int]): A list of project utilities.
+        - max_queue_size (int): The maximum number of nodes in the priority queue.
+        - tighter_bound (bool): Whether to use Martello and Toth's U2 bound, which
+        costs a little more per node than the fractional bound but prunes more nodes.
+        - stats (Dict[str, int]): An optional dictionary in which the number of
+        expanded 'nodes' and the 'peak_queue_size' are recorded.
+        - deadline (Deadline): An optional deadline, after which the incumbent, i.e.,
+        the best allocation found so far, is returned.
+        - workers (int): The number of worker processes to search with.
+        - progress (Callable[[List[int], int], None]): An optional function called with
+        the incumbent and each new best allocation, as a list of project ids, and its
+        utility. With more than one worker, it is called as each subtree completes.
 
     Returns:
         - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
@@ -97,67 +375,82 @@ def branch_and_bound_solver(
     # algorithm, which uses a greedy approach:
     candidates = sorted(
         [(project, utilities[i], costs[i]) for i, project in enumerate(projects)],
-        key=lambda t: t[1]/t[2],
+        key=lambda t: t[1]/t[2] if t[2] else float('inf'),
         reverse=True
     )
 
-    # Make a queue to store generated nodes:
-    queue: deque[Tuple[int, int, int]] = deque()
-    queue.append(AllocationNode(-1, 0, 0, 0, []))  # Root Node
+    # The prefix sums of the sorted candidates allow us to find
+    # the critical project of any node with a binary search:
+    prefix_costs: List[int] = [0]
+    prefix_utilities: List[int] = [0]
+    for _, utility, cost in candidates:
+        prefix_costs.append(prefix_costs[-1] + cost)
+        prefix_utilities.append(prefix_utilities[-1] + utility)
 
-    max_utility: int = 0
-    max_allocation: List[int] = []
+    # The ratio greedy allocation is our initial incumbent, which
+    # we store as a linked list like the allocations of the nodes:
+    greedy_allocation, max_utility = ratio_greedy_solver(budget, projects, costs, utilities)
+    max_taken: Optional[tuple] = None
+    for project in greedy_allocation:
+        max_taken = (project, max_taken)
+    if progress is not None:
+        progress(greedy_allocation, max_utility)
 
-    # Each allocation node has a level attribute, which considers
-    # all projects in the project subset {1, ..., level}.
-    while queue:
-        curr: AllocationNode = queue.popleft()
-        child: AllocationNode = AllocationNode(0, 0, 0, 0, [])
+    root: AllocationNode = AllocationNode(-1, 0, 0, 0, None)  # Root Node
+    root.bound = __bound(root, budget, candidates, prefix_costs, prefix_utilities, tighter_bound)
 
-        # If curr is the root node, then the child is
-        # at level zero:
-        if curr.level == -1:
-            child.level = 0
+    if workers <= 1:
+        max_utility, max_taken, nodes, peak_queue_size = __search(
+            [root], budget, candidates, prefix_costs, prefix_utilities,
+            max_utility, max_taken, max_queue_size, tighter_bound, deadline,
+            progress=progress
+        )
 
-        # If the current level (project subset) considers
-        # all items, then nothing more is to be done:
-        if curr.level == len(projects) - 1:
-            continue
+    else:
+        # We expand the tree breadth-first until there are a few
+        # promising subtrees for each worker:
+        frontier: List[AllocationNode] = [root]
+        nodes: int = 0
+        while frontier and len(frontier) < 4 * workers and frontier[0].level < len(candidates) - 1:
+            children: List[AllocationNode] = []
+            for curr in frontier:
+                if curr.bound <= max_utility:
+                    continue
+                nodes += 1
+                included, excluded = __branch(curr, budget, candidates, prefix_costs, prefix_utilities, tighter_bound)
+                if included.cost <= budget and included.utility > max_utility:
+                    max_utility = included.utility
+                    max_taken = included.taken
+                children.extend([included, excluded])
+            frontier = [child for child in children if child.bound > max_utility]
 
-        # Our first possible child considers the solution
-        # with the current project (level) included:
-        child.level = curr.level + 1
-        child.cost = curr.cost + candidates[child.level][2]
-        child.utility = curr.utility + candidates[child.level][1]
-        child.allocation = curr.allocation[:] + [candidates[child.level][0]]
+        # The most promising subtrees are searched first, so that
+        # a good incumbent is shared as early as possible:
+        frontier.sort(key=lambda node: node.bound, reverse=True)
+        incumbent = multiprocessing.Value('q', max_utility)
+        peak_queue_size: int = len(frontier)
 
-        # Update max_utility and max_allocation if including this
-        # item yields the best allocation and utility so far:
-        if child.cost <= budget and child.utility > max_utility:
-            max_utility = child.utility
-            max_allocation = child.allocation
-
-        # The upper bound gives the optimal solution for this
-        # child node if we can partially include the remaining
-        # items {level + 1, ..., n}.
-        child.bound = __bound(child, budget, candidates)
-
-        # If the child bound is larger than max_utility,
-        # then there is potential, so add it to the queue.
-        if child.bound > max_utility:
-            queue.append(child)
-        
-        # We repeat the process for a child node that does
-        # not include the current item (level). We hence do
-        # not try to update max_value or max_allocation: 
-        child = AllocationNode(0, 0, 0, 0, [])
-        child.level = curr.level + 1
-        child.cost = curr.cost
-        child.utility = curr.utility
-        child.allocation = curr.allocation[:]
-        child.bound = __bound(child, budget, candidates)
-
-        if child.bound > max_utility:
-            queue.append(child)
-    
-    return max_allocation, max_utility
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=__init_worker,
+            initargs=(
+                budget, candidates, prefix_costs, prefix_utilities,
+                max_queue_size, tighter_bound, deadline, incumbent
+            )
+        ) as executor:
+            for utility, taken, subtree_nodes, subtree_peak_queue_size in executor.map(__search_subtree, frontier):
+                # A worker only returns an allocation if it found one
+                # better than the incumbent it started from:
+                if taken is not None and utility > max_utility:
+                    max_utility = utility
+                    max_taken = taken
+                    if progress is not None:
+                        progress(__unroll(max_taken), max_utility)
+                nodes += subtree_nodes
+                peak_queue_size = max(peak_queue_size, subtree_peak_queue_size)
+
+    if stats is not None:
+        stats['nodes'] = nodes
+        stats['peak_queue_size'] = peak_queue_size
+
+    return __unroll(max_taken), max_utility
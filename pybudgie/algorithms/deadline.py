@@ -0,0 +1,41 @@
+from timeit import default_timer as timer
+
+
+# The seconds between checks of the cancellation event, since
+# a multiprocessing.Event takes a lock on every check:
+CANCEL_CHECK_INTERVAL_S: float = 0.001
+
+
+class Deadline:
+    def __init__(self, time_limit_ms: float = None, cancelled=None) -> None:
+        """
+        Constructs a Deadline object, which the algorithms check cooperatively such
+        that they can stop early and return the best allocation found so far.
+
+        Parameters:
+            - time_limit_ms (float): The time limit in milliseconds from now. If this
+            is not provided, then the deadline never expires.
+            - cancelled (multiprocessing.Event): An optional event which expires the
+            deadline once it is set. A multiprocessing.Event is also seen by the worker
+            processes of the algorithms, whereas a threading.Event cannot be sent to them.
+        """
+
+        self.end_time = None if time_limit_ms is None else timer() + time_limit_ms / 1_000
+        self.cancelled = cancelled
+        self.next_cancel_check = 0.0
+        self.reached = False
+
+    def expired(self) -> bool:
+        """
+        Returns:
+            - bool: Whether the deadline has passed, or has been cancelled. Once this
+            returns True, the reached attribute records that an algorithm was cut short.
+        """
+        if not self.reached:
+            now: float = timer()
+            if self.end_time is not None and now >= self.end_time:
+                self.reached = True
+            elif self.cancelled is not None and now >= self.next_cancel_check:
+                self.next_cancel_check = now + CANCEL_CHECK_INTERVAL_S
+                self.reached = self.cancelled.is_set()
+        return self.reached
@@ -1,11 +1,237 @@
+from .deadline import Deadline
 from typing import List, Tuple
+import numpy as np
+
+
+def __backtrack(
+        decisions: np.ndarray,
+        projects: List[int],
+        weights: List[int],
+        column: int
+) -> List[int]:
+    """
+    Recovers an allocation from a packed bit matrix of decisions, where bit (i, j)
+    is set if and only if project i was included in the best solution for the
+    first i + 1 projects at column j.
+
+    Parameters:
+        - decisions (np.ndarray): The packed bit matrix, with one row per project.
+        - projects (List[int]): A list of project identifiers.
+        - weights (List[int]): The amount by which including each project moves
+        the column, e.g., the project costs for a budget-indexed matrix.
+        - column (int): The column from which to start backtracking.
+
+    Returns:
+        - List[int]: The allocation as a list of project ids.
+    """
+
+    allocation: List[int] = []
+    i: int = len(projects)
+    j: int = column
+
+    # Projects that cost nothing may also be included at column 0:
+    while i > 0:
+        if decisions[i - 1][j >> 3] & (0x80 >> (j & 7)):
+            allocation.append(projects[i - 1])
+            j -= weights[i - 1]
+        i -= 1
+
+    return allocation
+
+
+def __vectorized_table(
+        budget: int,
+        costs: List[int],
+        utilities: List[int],
+        deadline: Deadline = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fills the rolling row and packed bit matrix of decisions of the NumPy engine,
+    see __vectorized_solver.
+
+    Parameters:
+        - budget (int): The largest budget, i.e., the last column of the row.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - deadline (Deadline): An optional deadline, after which the decisions of
+        the remaining projects are left unset.
+
+    Returns:
+        - Tuple[np.ndarray, np.ndarray]: The final row, i.e., the maximum utility
+        for every budget {0, 1, ..., budget}, and the packed bit matrix of decisions.
+    """
+
+    # The rolling row holds dp[i][j] for every budget j after
+    # the first i projects have been considered:
+    row: np.ndarray = np.zeros(budget + 1, dtype=np.int64)
+    decisions: np.ndarray = np.zeros((len(costs), (budget + 8) // 8), dtype=np.uint8)
+    taken: np.ndarray = np.zeros(budget + 1, dtype=bool)
+
+    for i in range(len(costs)):
+        # The decisions of the remaining projects are all unset,
+        # so the backtracking below simply skips them:
+        if deadline is not None and deadline.expired():
+            break
+
+        # A project that costs nothing starts from column 0, such
+        # that its utility is added at every budget:
+        start: int = costs[i]
+        if start > budget:
+            continue
+
+        # The right-hand side is evaluated before assignment,
+        # so it only ever reads values from the previous row:
+        utility_with_project: np.ndarray = row[start - costs[i]:budget + 1 - costs[i]] + utilities[i]
+        np.greater(utility_with_project, row[start:], out=taken[start:])
+        np.maximum(utility_with_project, row[start:], out=row[start:])
+
+        decisions[i] = np.packbits(taken)
+        taken[start:] = False
+
+    return row, decisions
+
+
+def __vectorized_solver(
+        budget: int,
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int],
+        deadline: Deadline = None
+) -> Tuple[List[int], int]:
+    """
+    The NumPy engine for the dynamic programming solver. It computes exactly the
+    same recurrence as the pure Python engine, but only keeps a single rolling row
+    of the matrix, which is updated with whole-array operations for each project.
+    The include/exclude decisions are recorded as a packed bit matrix, i.e., one
+    bit per (i, j) pair, which is all we need to backtrack the allocation.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - projects (List[int]): A list of project identifiers.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - deadline (Deadline): An optional deadline, after which the best allocation
+        of the projects considered so far is returned.
+
+    Returns:
+        - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
+        ids, and the overall value with regard to the welfare function.
+    """
+
+    row, decisions = __vectorized_table(budget, costs, utilities, deadline)
+
+    # A set bit means the maximum value changed when including
+    # the item, which is the same test as in the full matrix:
+    return __backtrack(decisions, projects, costs, budget), int(row[-1])
+
+
+def __final_row(
+        budget: int,
+        costs: List[int],
+        utilities: List[int],
+        indexes: List[int],
+        deadline: Deadline = None
+) -> np.ndarray:
+    """
+    Computes only the final row of the dynamic programming matrix for a subset of
+    the projects, i.e., the maximum utility achievable with every budget
+    {0, 1, ..., budget}, using a single rolling row.
+
+    Parameters:
+        - budget (int): The budget, i.e., the last column of the row.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - indexes (List[int]): The indexes of the projects to consider.
+        - deadline (Deadline): An optional deadline, after which the remaining
+        projects are left out of the row.
+
+    Returns:
+        - np.ndarray: The row of (budget + 1) maximum utilities.
+    """
+
+    row: np.ndarray = np.zeros(budget + 1, dtype=np.int64)
+    for i in indexes:
+        if deadline is not None and deadline.expired():
+            break
+        if costs[i] > budget:
+            continue
+        np.maximum(row[:budget + 1 - costs[i]] + utilities[i], row[costs[i]:], out=row[costs[i]:])
+    return row
+
+
+def __linear_memory_solver(
+        budget: int,
+        costs: List[int],
+        utilities: List[int],
+        indexes: List[int],
+        allocation: List[int],
+        deadline: Deadline = None
+) -> None:
+    """
+    The linear-memory engine for the dynamic programming solver, which recovers
+    the allocation by divide-and-conquer (as in Hirschberg's algorithm) instead
+    of keeping a decision for every (i, j) pair.
+
+    We split the projects into two halves and compute the final rows F and G of
+    each half. The optimal allocation spends some b of the budget on the first
+    half and (budget - b) on the second half, where b maximises F[b] + G[budget - b].
+    We then recurse into each half with its share of the budget. Only two rows are
+    held at any time, so the memory is O(budget), at the expense of computing each
+    row O(log n) times.
+
+    Parameters:
+        - budget (int): The budget available to these projects.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - indexes (List[int]): The indexes of the projects to consider.
+        - allocation (List[int]): The list to which the indexes of the projects in
+        the optimal allocation are appended.
+        - deadline (Deadline): An optional deadline, after which the projects in any
+        remaining splits are added in order for as long as they fit their budget.
+    """
+
+    if not indexes:
+        return
+
+    if deadline is not None and deadline.expired():
+        for i in indexes:
+            if costs[i] <= budget and utilities[i] > 0:
+                allocation.append(i)
+                budget -= costs[i]
+        return
+
+    # A single project is included if and only if it is
+    # affordable and adds utility:
+    if len(indexes) == 1:
+        if costs[indexes[0]] <= budget and utilities[indexes[0]] > 0:
+            allocation.append(indexes[0])
+        return
+
+    middle: int = len(indexes) // 2
+    left: List[int] = indexes[:middle]
+    right: List[int] = indexes[middle:]
+
+    # Reversing the right row aligns G[budget - b] with F[b], and
+    # the rows are released before we recurse. If the deadline cuts
+    # a row short, the split still divides the budget, and both
+    # halves then fall back to adding their projects in order:
+    split: int = int(np.argmax(
+        __final_row(budget, costs, utilities, left, deadline) +
+        __final_row(budget, costs, utilities, right, deadline)[::-1]
+    ))
+
+    __linear_memory_solver(split, costs, utilities, left, allocation, deadline)
+    __linear_memory_solver(budget - split, costs, utilities, right, allocation, deadline)
 
 
 def dynamic_programming_solver(
         budget: int,
         projects: List[int], 
         costs: List[int],
-        utilities: List[int]
+        utilities: List[int],
+        vectorized: bool = False,
+        linear_memory: bool = False,
+        deadline: Deadline = None
 ) -> Tuple[List[int], int]:
     """
     An exact algorithm for participatory budgeting problems formulated as the
@@ -15,19 +241,36 @@ def dynamic_programming_solver(
     at any (i, j) pair, where i means we only have access to the first i projects, 
     i.e., {1, 2, ..., i}, and j means we only have j budget available. The base
     cases are simple: dp[0][j] = 0 for all j because there are no items to choose
-    from, and dp[i][0] = 0 for all i, assuming all values are positive, because
-    we have no budget. Each successive case can then use previous solutions.
+    from. Each successive case can then use previous solutions, including those
+    with no budget, at which only projects that cost nothing can be included.
 
     Parameters:
         - budget (int): The total budget of the instance.
         - projects (List[int]): A list of project identifiers.
         - costs (List[int]): A list of project costs.
         - utilities (List[int]): A list of project utilities.
+        - vectorized (bool): Whether to use the NumPy engine, which keeps a single
+        rolling row and a packed bit matrix of decisions instead of the full matrix.
+        It returns the same allocation and utility using roughly 1/64 of the memory.
+        - linear_memory (bool): Whether to use the divide-and-conquer engine, which
+        only keeps O(budget) memory and recomputes rows to recover the allocation.
+        It returns an optimal allocation, though ties between allocations of equal
+        utility may be broken differently.
+        - deadline (Deadline): An optional deadline, after which the best allocation
+        of the projects considered so far is returned.
 
     Returns:
         - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
         ids, and the overall value with regard to the welfare function.
     """
+
+    if linear_memory:
+        indexes: List[int] = []
+        __linear_memory_solver(budget, costs, utilities, list(range(len(projects))), indexes, deadline)
+        return [projects[i] for i in indexes], sum(utilities[i] for i in indexes)
+
+    if vectorized:
+        return __vectorized_solver(budget, projects, costs, utilities, deadline)
     
     # The dynamic programming matrix is initialised with zeroes,
     # thuis the base cases are already filled:
@@ -36,10 +279,18 @@ def dynamic_programming_solver(
         for _ in range(len(projects) + 1)
     ]
 
+    # The number of rows filled, which is less than the number
+    # of projects only if the deadline cuts the loop short:
+    rows: int = len(projects)
+
     # We iterate through every possible item subset with every
-    # possible integer budget {1, 2, ..., budget}:
+    # possible integer budget {0, 1, ..., budget}:
     for i in range(1, len(projects) + 1):
-        for j in range(1, budget + 1):
+        if deadline is not None and deadline.expired():
+            rows = i - 1
+            break
+
+        for j in range(budget + 1):
 
             # At each (i, j) pair, we decide either to exclude
             # or include the item i:
@@ -62,17 +313,199 @@ def dynamic_programming_solver(
     # The best value is stored at the very end of the matrix.
     # We can find the optimal allocation that gives this
     # value by backtracking.
-    best_value: int = dp[-1][-1]
+    best_value: int = dp[rows][-1]
     allocation: List[int] = []
-    i: int = len(projects)
+    i: int = rows
     j: int = budget
 
     # We add item indexes where the maximum value possible changes,
     # because it must be the case that the item was included.
-    while i > 0 and j > 0:
+    while i > 0:
         if dp[i][j] != dp[i - 1][j]:
             allocation.append(projects[i - 1])
             j -= costs[i - 1]
         i -= 1
     
     return allocation, best_value
+
+
+def table_columns(budget: int, costs: List[int], utilities: List[int]) -> Tuple[int, bool]:
+    """
+    Chooses the smaller of the two dynamic programming tables, i.e., the table
+    indexed by budget, or the table of min_cost_dynamic_programming_solver indexed
+    by the total utility of the projects that fit the budget and add utility.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+
+    Returns:
+        - Tuple[int, bool]: The number of columns of the smaller table, and whether
+        it is indexed by utility.
+    """
+
+    total_utility: int = sum(
+        utility for cost, utility in zip(costs, utilities)
+        if cost <= budget and utility > 0
+    )
+    if total_utility < budget:
+        return total_utility + 1, True
+    return budget + 1, False
+
+
+def __min_cost_table(
+        budget: int,
+        costs: List[int],
+        utilities: List[int],
+        deadline: Deadline = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fills the rolling row and packed bit matrix of decisions of the min-cost
+    solver, see min_cost_dynamic_programming_solver.
+
+    Parameters:
+        - budget (int): The largest budget, beyond which projects are ignored.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - deadline (Deadline): An optional deadline, after which the decisions of
+        the remaining projects are left unset.
+
+    Returns:
+        - Tuple[np.ndarray, np.ndarray]: The final row, i.e., the minimum cost of
+        every total utility, and the packed bit matrix of decisions.
+    """
+
+    # Projects that cost more than the budget or add no utility
+    # can never be part of a better allocation:
+    total_utility: int = sum(
+        utility for cost, utility in zip(costs, utilities)
+        if cost <= budget and utility > 0
+    )
+
+    # Unreachable utilities have an (effectively) infinite cost,
+    # which cannot overflow when a project cost is added to it:
+    unreachable: int = np.iinfo(np.int64).max // 2
+    row: np.ndarray = np.full(total_utility + 1, unreachable, dtype=np.int64)
+    row[0] = 0
+
+    decisions: np.ndarray = np.zeros((len(costs), (total_utility + 8) // 8), dtype=np.uint8)
+    taken: np.ndarray = np.zeros(total_utility + 1, dtype=bool)
+
+    for i in range(len(costs)):
+        if deadline is not None and deadline.expired():
+            break
+
+        if costs[i] > budget or utilities[i] <= 0:
+            continue
+
+        # At each utility u, we either exclude the project, or we
+        # include it on top of the cheapest way to reach u - utility:
+        start: int = utilities[i]
+        cost_with_project: np.ndarray = row[:total_utility + 1 - start] + costs[i]
+        np.less(cost_with_project, row[start:], out=taken[start:])
+        np.minimum(cost_with_project, row[start:], out=row[start:])
+
+        decisions[i] = np.packbits(taken)
+        taken[start:] = False
+
+    return row, decisions
+
+
+def min_cost_dynamic_programming_solver(
+        budget: int,
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int],
+        deadline: Deadline = None
+) -> Tuple[List[int], int]:
+    """
+    An exact algorithm for participatory budgeting problems formulated as the
+    binary knapsack problem.
+
+    This is the dual of the budget-indexed dynamic programming solver: we index
+    the states by achievable utility rather than budget, and hold the minimum cost
+    at which each total utility u in {0, 1, ..., U} can be reached, where U is the
+    total utility of all projects. The best value is then the largest utility that
+    can be reached within the budget. The table has (U + 1) columns instead of
+    (budget + 1), which is far smaller for approval-voting instances, in which
+    the total utility is small compared to the budget in currency units.
+
+    We use the same rolling row and packed bit matrix of decisions as the
+    vectorized engine of the budget-indexed solver.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - projects (List[int]): A list of project identifiers.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - deadline (Deadline): An optional deadline, after which the best allocation
+        of the projects considered so far is returned.
+
+    Returns:
+        - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
+        ids, and the overall value with regard to the welfare function.
+    """
+
+    row, decisions = __min_cost_table(budget, costs, utilities, deadline)
+
+    # The best value is the largest utility reachable within
+    # the budget, which always exists since row[0] = 0:
+    best_value: int = int(np.flatnonzero(row <= budget)[-1])
+    return __backtrack(decisions, projects, utilities, best_value), best_value
+
+
+def dynamic_programming_budget_sweep(
+        budgets: List[int],
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int],
+        min_cost: bool = False,
+        deadline: Deadline = None
+) -> Tuple[List[Tuple[List[int], int]], np.ndarray]:
+    """
+    Finds an optimal allocation for each of several budgets from a single dynamic
+    programming table, filled once for the largest budget. Since bit (i, j) of the
+    decisions holds for every budget j, we can backtrack from the column of each
+    budget, and the final row is the optimal utility of every smaller budget.
+
+    Parameters:
+        - budgets (List[int]): The budgets for which to find allocations.
+        - projects (List[int]): A list of project identifiers.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - min_cost (bool): Whether to index the table by utility, as in
+        min_cost_dynamic_programming_solver, rather than by budget.
+        - deadline (Deadline): An optional deadline, after which the best allocations
+        of the projects considered so far are returned.
+
+    Returns:
+        - Tuple[List[Tuple[List[int], int]], np.ndarray]: A pair containing the allocation
+        and utility for each budget, in the order given, and the optimal utility for every
+        budget {0, 1, ..., max(budgets)}.
+    """
+
+    max_budget: int = max(budgets)
+    results: List[Tuple[List[int], int]] = []
+
+    if not min_cost:
+        row, decisions = __vectorized_table(max_budget, costs, utilities, deadline)
+        for budget in budgets:
+            results.append((__backtrack(decisions, projects, costs, budget), int(row[budget])))
+        return results, row
+
+    row, decisions = __min_cost_table(max_budget, costs, utilities, deadline)
+
+    # The cheapest way to reach a utility of at least u is
+    # non-decreasing in u, so the best utility of budget b
+    # is the last u whose cheapest cost is at most b:
+    cheapest: np.ndarray = np.minimum.accumulate(row[::-1])[::-1]
+    curve: np.ndarray = np.searchsorted(cheapest, np.arange(max_budget + 1), side='right') - 1
+
+    # The last such u is itself reachable within budget b,
+    # hence we can backtrack from its column:
+    for budget in budgets:
+        best_value: int = int(curve[budget])
+        results.append((__backtrack(decisions, projects, utilities, best_value), best_value))
+
+    return results, curve
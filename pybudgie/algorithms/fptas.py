@@ -0,0 +1,67 @@
+from .dyn_prog import min_cost_dynamic_programming_solver
+from .deadline import Deadline
+from typing import List, Tuple
+import math
+
+
+def fptas_solver(
+        budget: int,
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int],
+        epsilon: float = 0.1,
+        deadline: Deadline = None
+) -> Tuple[List[int], int]:
+    """
+    A fully polynomial-time approximation scheme (FPTAS) for participatory budgeting
+    problems formulated as the binary knapsack problem.
+
+    We scale every utility down by a factor K = epsilon * max_utility / n and round
+    it down, such that the total scaled utility is at most n^2 / epsilon, and then
+    solve the scaled problem exactly with the utility-indexed dynamic programming
+    solver. The rounding loses at most K per project, i.e., at most epsilon times
+    the largest utility, hence the allocation found is guaranteed to have at least
+    (1 - epsilon) of the optimal utility, in O(n^3 / epsilon) time.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - projects (List[int]): A list of project identifiers.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - epsilon (float): The maximum fraction of the optimal utility that may be
+        lost, in the range (0, 1). Smaller values are more accurate but slower.
+        - deadline (Deadline): An optional deadline, after which the best allocation
+        of the projects considered so far is returned, without the guarantee.
+
+    Returns:
+        - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
+        ids, and the overall value with regard to the welfare function.
+    """
+
+    if not 0 < epsilon < 1:
+        raise ValueError(f'epsilon must be in the range (0, 1), not {epsilon}')
+
+    # Only projects that fit the budget and add utility can be
+    # part of the optimal allocation:
+    candidates: List[int] = [
+        i for i in range(len(projects))
+        if costs[i] <= budget and utilities[i] > 0
+    ]
+    if not candidates:
+        return [], 0
+
+    # If the scaling factor is at most one, then the exact
+    # problem is already small enough to solve directly:
+    scale: float = max(1.0, epsilon * max(utilities[i] for i in candidates) / len(candidates))
+
+    indexes, _ = min_cost_dynamic_programming_solver(
+        budget=budget,
+        projects=candidates,
+        costs=[costs[i] for i in candidates],
+        utilities=[math.floor(utilities[i] / scale) for i in candidates],
+        deadline=deadline
+    )
+
+    # The utility is computed from the original, unscaled values:
+    allocation: List[int] = [projects[i] for i in indexes]
+    return allocation, sum(utilities[i] for i in indexes)
@@ -1,5 +1,13 @@
-from typing import List, Tuple
+from .deadline import Deadline
+from typing import List, Tuple, Callable
+import multiprocessing
+import numpy as np
 import random
+import queue
+
+# How long an island process has to exit once it has reported
+# its result before it is terminated:
+ISLAND_JOIN_GRACE_MS: float = 1_000
 
 
 def __create_population(n_projects: int, population_size: int) -> List[List[int]]:
@@ -67,6 +75,60 @@ def __fitness(
 
 
 
+def __repair_order(costs: List[int], utilities: List[int]) -> List[int]:
+    """
+    Parameters:
+        - costs (List[int]): The costs of the projects in the instance.
+        - utilities (List[int]): The utilities of the projects in the instance.
+
+    Returns:
+        - List[int]: The project indexes in increasing order of their utility-cost
+        ratio, i.e., the order in which to drop projects to repair a chromosome.
+        Dropping a project that costs nothing cannot help, so these come last.
+    """
+    return sorted(
+        range(len(costs)),
+        key=lambda i: utilities[i] / costs[i] if costs[i] else float('inf')
+    )
+
+
+def __repair(
+        budget: int,
+        costs: List[int],
+        repair_order: List[int],
+        chromosome: List[int]
+) -> List[int]:
+    """
+    Repairs a chromosome that exceeds the budget by greedily dropping the
+    projects with the lowest utility-cost ratio until it fits the budget,
+    such that no generation is wasted on infeasible chromosomes.
+
+    Parameters:
+        - budget (int): The budget of the instance.
+        - costs (List[int]): The costs of the projects in the instance.
+        - repair_order (List[int]): The project indexes in the order to drop them.
+        - chromosome (List[int]): The chromosome to repair.
+
+    Returns:
+        - List[int]: The chromosome if it fits the budget, or a repaired copy.
+    """
+
+    total_cost: int = sum(cost for cost, gene in zip(costs, chromosome) if gene)
+    if total_cost <= budget:
+        return chromosome
+
+    # The chromosome may be shared with its parents, so we
+    # repair a copy instead:
+    chromosome = chromosome[:]
+    for i in repair_order:
+        if total_cost <= budget:
+            break
+        if chromosome[i]:
+            chromosome[i] = 0
+            total_cost -= costs[i]
+    return chromosome
+
+
 def __selection(
         budget: int,
         costs: List[int],
@@ -152,6 +214,319 @@ def __mutation(
     return chromosome
 
 
+def __vectorized_fitness(
+        budget: int,
+        costs: np.ndarray,
+        utilities: np.ndarray,
+        population: np.ndarray
+) -> np.ndarray:
+    """
+    Calculates the fitness of a whole population at once, with the same
+    negative fitness for chromosomes that exceed the budget as __fitness.
+
+    Parameters:
+        - budget (int): The budget of the instance.
+        - costs (np.ndarray): The costs of the projects in the instance.
+        - utilities (np.ndarray): The utilities of the projects in the instance.
+        - population (np.ndarray): A boolean matrix with one chromosome per row.
+
+    Returns:
+        - np.ndarray: The fitness (i.e. utility) value of each chromosome.
+    """
+
+    total_utilities: np.ndarray = population @ utilities
+    total_costs: np.ndarray = population @ costs
+    return np.where(total_costs > budget, -total_utilities, total_utilities)
+
+
+def __vectorized_generation(
+        rng: np.random.Generator,
+        population: np.ndarray,
+        fitness: np.ndarray,
+        mutation_rate: float,
+        crossover_rate: float
+) -> np.ndarray:
+    """
+    Generates the offspring of a whole population at once, using the same
+    tournament selection, single-point crossover and single-gene mutation as
+    __selection, __crossover and __mutation, expressed as array operations.
+
+    Parameters:
+        - rng (np.random.Generator): The random number generator to use.
+        - population (np.ndarray): A boolean matrix with one chromosome per row.
+        - fitness (np.ndarray): The fitness of each chromosome in the population.
+        - mutation_rate (float): The probability of a chromosome being mutated.
+        - crossover_rate (float): The probability of two chromosome crossing over.
+
+    Returns:
+        - np.ndarray: The offspring population, with two children per pair of parents.
+    """
+
+    population_size, n_projects = population.shape
+    num_pairs: int = (population_size + 1) // 2
+
+    # Tournament selection of size two, where each row of
+    # contestants holds the two chromosomes competing for
+    # parent a and the two competing for parent b:
+    contestants: np.ndarray = rng.integers(population_size, size=(num_pairs, 2, 2))
+    winners: np.ndarray = np.where(
+        fitness[contestants[:, :, 0]] >= fitness[contestants[:, :, 1]],
+        contestants[:, :, 0],
+        contestants[:, :, 1]
+    )
+    parent_a: np.ndarray = population[winners[:, 0]]
+    parent_b: np.ndarray = population[winners[:, 1]]
+
+    # Each pair crosses over with probability crossover_rate,
+    # by keeping its own genes before the crossover point:
+    keep: np.ndarray = np.ones((num_pairs, n_projects), dtype=bool)
+    if n_projects > 1:
+        crossover_points: np.ndarray = rng.integers(1, n_projects, size=num_pairs)
+        crossed: np.ndarray = rng.random(num_pairs) < crossover_rate
+        keep[crossed] = np.arange(n_projects) < crossover_points[crossed, None]
+
+    offspring: np.ndarray = np.concatenate((
+        np.where(keep, parent_a, parent_b),
+        np.where(keep, parent_b, parent_a)
+    ))
+
+    # Each child flips a single random gene with
+    # probability mutation_rate:
+    mutants: np.ndarray = np.flatnonzero(rng.random(len(offspring)) < mutation_rate)
+    mutation_points: np.ndarray = rng.integers(n_projects, size=len(mutants))
+    offspring[mutants, mutation_points] ^= True
+
+    return offspring
+
+
+def __vectorized_repair(
+        budget: int,
+        costs: np.ndarray,
+        repair_order: List[int],
+        population: np.ndarray
+) -> None:
+    """
+    Repairs a whole population in place, like __repair, by dropping each project
+    in repair_order from every chromosome that still exceeds the budget.
+
+    Parameters:
+        - budget (int): The budget of the instance.
+        - costs (np.ndarray): The costs of the projects in the instance.
+        - repair_order (List[int]): The project indexes in the order to drop them.
+        - population (np.ndarray): A boolean matrix with one chromosome per row.
+    """
+
+    total_costs: np.ndarray = population @ costs
+    for i in repair_order:
+        over_budget: np.ndarray = total_costs > budget
+        if not over_budget.any():
+            break
+        dropped: np.ndarray = over_budget & population[:, i]
+        population[dropped, i] = False
+        total_costs[dropped] -= costs[i]
+
+
+def __vectorized_evolve(
+        budget: int,
+        costs: np.ndarray,
+        utilities: np.ndarray,
+        population_size: int,
+        mutation_rate: float,
+        crossover_rate: float,
+        num_generations: int,
+        repair: bool,
+        elitism: int,
+        stagnation_limit: int,
+        deadline: Deadline = None,
+        migrate: Callable[[int, np.ndarray, np.ndarray], bool] = None
+) -> Tuple[int, np.ndarray]:
+    """
+    Evolves a single population with the NumPy engine, which holds the population
+    as a boolean matrix, computes the fitness of a whole generation as one
+    matrix-vector product, and generates the offspring with array operations.
+    See genetic_algorithm_solver for the parameters.
+
+    Parameters:
+        - migrate (Callable[[int, np.ndarray, np.ndarray], bool]): An optional
+        function called after every generation with the generation number, the
+        population and its fitness, which may replace chromosomes in place, in
+        which case it returns True such that the fitness is recalculated.
+
+    Returns:
+        - Tuple[int, np.ndarray]: The fitness and genes of the best chromosome.
+    """
+
+    rng: np.random.Generator = np.random.default_rng()
+    repair_order: List[int] = __repair_order(costs, utilities)
+
+    # Initial Population
+    population: np.ndarray = rng.random((population_size, len(costs))) < 0.5
+    if repair:
+        __vectorized_repair(budget, costs, repair_order, population)
+    fitness: np.ndarray = __vectorized_fitness(budget, costs, utilities, population)
+
+    best_fitness: int = int(fitness.max())
+    stagnant_generations: int = 0
+
+    # Generate offspring num_generations times
+    for generation in range(1, num_generations + 1):
+        if deadline is not None and deadline.expired():
+            break
+
+        offspring: np.ndarray = __vectorized_generation(rng, population, fitness, mutation_rate, crossover_rate)
+        if repair:
+            __vectorized_repair(budget, costs, repair_order, offspring)
+
+        # The fittest chromosomes survive unchanged, of which
+        # there are at most as many as there are offspring:
+        survivors: int = min(elitism, len(population), len(offspring))
+        if survivors > 0:
+            offspring[:survivors] = population[np.argsort(fitness)[-survivors:]]
+
+        population = offspring
+        fitness = __vectorized_fitness(budget, costs, utilities, population)
+
+        if migrate is not None and migrate(generation, population, fitness):
+            fitness = __vectorized_fitness(budget, costs, utilities, population)
+
+        # Stop once the best fitness has stagnated:
+        if fitness.max() > best_fitness:
+            best_fitness = int(fitness.max())
+            stagnant_generations = 0
+        else:
+            stagnant_generations += 1
+            if stagnation_limit is not None and stagnant_generations >= stagnation_limit:
+                break
+
+    best: int = int(np.argmax(fitness))
+    return int(fitness[best]), population[best]
+
+
+def __run_island(
+        inbox: multiprocessing.Queue,
+        outbox: multiprocessing.Queue,
+        results: multiprocessing.Queue,
+        migration_interval: int,
+        migration_size: int,
+        **parameters
+) -> None:
+    """
+    Evolves a single island population in a worker process with the NumPy engine.
+    Every migration_interval generations, the island sends copies of its best
+    migration_size chromosomes to the next island, and replaces its worst
+    chromosomes with any migrants that have arrived from the previous island.
+    Migrants are never waited for, so islands that run at different speeds, or
+    stop early at the deadline, cannot block each other.
+
+    Parameters:
+        - inbox (multiprocessing.Queue): The queue of migrants from the previous island.
+        - outbox (multiprocessing.Queue): The queue of migrants to the next island.
+        - results (multiprocessing.Queue): The queue to which the fitness and
+        chromosome of the best chromosome of the final population is sent, or
+        the exception raised if the island failed.
+        - migration_interval (int): The number of generations between migrations.
+        - migration_size (int): The number of chromosomes that migrate from each island.
+        - parameters: The parameters of __vectorized_evolve.
+    """
+
+    def migrate(generation: int, population: np.ndarray, fitness: np.ndarray) -> bool:
+        if generation % migration_interval != 0:
+            return False
+
+        # Emigrate copies of the fittest chromosomes:
+        ranking: np.ndarray = np.argsort(fitness)
+        outbox.put(population[ranking[-migration_size:]].copy())
+
+        # Immigrants replace the least fit chromosomes:
+        try:
+            while True:
+                migrants: np.ndarray = inbox.get_nowait()[:len(ranking)]
+                population[ranking[:len(migrants)]] = migrants
+                ranking = ranking[len(migrants):]
+        except queue.Empty:
+            pass
+        return True
+
+    # Migrants that a neighbour never reads are discarded when the island
+    # exits, since a process otherwise waits for everything it has put on
+    # a queue to be flushed, which blocks once the pipe buffer is full:
+    inbox.cancel_join_thread()
+    outbox.cancel_join_thread()
+
+    try:
+        results.put(__vectorized_evolve(migrate=migrate, **parameters))
+    except Exception as exception:
+        results.put(exception)
+
+
+def __island_solver(
+        islands: int,
+        migration_interval: int,
+        migration_size: int,
+        **parameters
+) -> Tuple[int, np.ndarray]:
+    """
+    The island-model engine for the genetic algorithm solver, which evolves
+    several populations in separate processes, arranged in a ring, and migrates
+    the fittest chromosomes between neighbouring islands. See __run_island and
+    genetic_algorithm_solver for the parameters.
+
+    Returns:
+        - Tuple[int, np.ndarray]: The fitness and genes of the best chromosome.
+    """
+
+    # Island i receives its migrants from queue i and sends its
+    # emigrants to queue i + 1, which closes the ring:
+    queues: List[multiprocessing.Queue] = [multiprocessing.Queue() for _ in range(islands)]
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    processes: List[multiprocessing.Process] = [
+        multiprocessing.Process(
+            target=__run_island,
+            args=(queues[i], queues[(i + 1) % islands], results, migration_interval, migration_size),
+            kwargs=parameters,
+            daemon=True
+        )
+        for i in range(islands)
+    ]
+    for process in processes:
+        process.start()
+
+    # The results are collected before joining, since a process
+    # cannot exit until the data it has put on a queue is consumed.
+    # We stop waiting if every island has exited, e.g., if one was
+    # killed before it could report:
+    outcomes: list = []
+    while len(outcomes) < islands:
+        try:
+            outcomes.append(results.get(timeout=0.05))
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                try:
+                    while len(outcomes) < islands:
+                        outcomes.append(results.get(timeout=0.05))
+                except queue.Empty:
+                    pass
+                break
+
+    for process in processes:
+        process.join(ISLAND_JOIN_GRACE_MS / 1_000)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    # Failed islands are skipped, unless every island failed:
+    reported: List[Tuple[int, np.ndarray]] = [
+        outcome for outcome in outcomes if not isinstance(outcome, Exception)
+    ]
+    if not reported:
+        failures: List[Exception] = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+        if failures:
+            raise failures[0]
+        raise RuntimeError('Every island exited without reporting a result.')
+
+    return max(reported, key=lambda result: result[0])
+
+
 def genetic_algorithm_solver(
         budget: int,
         projects: List[int], 
@@ -160,7 +535,15 @@ def genetic_algorithm_solver(
         population_size: int = 100,
         mutation_rate: float = 0.3,
         crossover_rate: float = 0.8,
-        num_generations: int = 250
+        num_generations: int = 250,
+        deadline: Deadline = None,
+        vectorized: bool = False,
+        islands: int = 1,
+        migration_interval: int = 10,
+        migration_size: int = 5,
+        repair: bool = False,
+        elitism: int = 0,
+        stagnation_limit: int = None
 ) -> Tuple[List[int], int]:
     """
     A relatively fast approximation scheme for participatory budgeting
@@ -176,22 +559,92 @@ def genetic_algorithm_solver(
         - crossover_rate (float): The probability of two chromosome crossing over.
         - num_generations (int): The number of generations before returning the
         best chromosome found.
+        - deadline (Deadline): An optional deadline, after which the best chromosome
+        of the last complete population is returned.
+        - vectorized (bool): Whether to use the NumPy engine, which holds the population
+        as a boolean matrix and evaluates each generation with array operations.
+        - islands (int): The number of island populations, each of population_size, to
+        evolve in separate processes with the NumPy engine. One means no island model.
+        - migration_interval (int): The number of generations between migrations.
+        - migration_size (int): The number of chromosomes that migrate from each island.
+        - repair (bool): Whether to repair chromosomes that exceed the budget, by greedily
+        dropping the projects with the lowest utility-cost ratio until they fit.
+        - elitism (int): The number of fittest chromosomes that survive unchanged into
+        the next generation.
+        - stagnation_limit (int): An optional number of generations without improvement
+        to the best fitness, after which we stop early.
 
     Returns:
         - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
         ids, and the overall value with regard to the welfare function.
     """
+
+    if not projects:
+        return [], 0
+
+    if vectorized or islands > 1:
+        parameters: dict = dict(
+            budget=budget,
+            costs=np.array(costs, dtype=np.int64),
+            utilities=np.array(utilities, dtype=np.int64),
+            population_size=population_size,
+            mutation_rate=mutation_rate,
+            crossover_rate=crossover_rate,
+            num_generations=num_generations,
+            repair=repair,
+            elitism=elitism,
+            stagnation_limit=stagnation_limit,
+            deadline=deadline
+        )
+
+        if islands > 1:
+            best_fitness, best_chromosome = __island_solver(
+                islands, migration_interval, migration_size, **parameters
+            )
+        else:
+            best_fitness, best_chromosome = __vectorized_evolve(**parameters)
+
+        # If no chromosome fits the budget, then the empty
+        # allocation is the best valid allocation:
+        if best_fitness < 0:
+            return [], 0
+
+        allocation: List[int] = [projects[idx] for idx in np.flatnonzero(best_chromosome)]
+        return allocation, best_fitness
+
+    repair_order: List[int] = __repair_order(costs, utilities)
     
     # Initial Population
     population: List[int] = __create_population(len(projects), population_size)
+    if repair:
+        population = [__repair(budget, costs, repair_order, chromosome) for chromosome in population]
+
+    best_fitness: int = max(
+        (__fitness(budget, costs, utilities, chromosome) for chromosome in population),
+        default=0
+    )
+    stagnant_generations: int = 0
 
     # Generate offspring num_generations times
     for _ in range(num_generations):
         offspring: List[List[int]] = []
 
+        # The fittest chromosomes survive unchanged, of which
+        # there are at most as many as in the population:
+        survivors: int = min(elitism, len(population))
+        if survivors > 0:
+            offspring.extend(chromosome[:] for chromosome in sorted(
+                population,
+                key=lambda chromosome: __fitness(budget, costs, utilities, chromosome)
+            )[-survivors:])
+
         # The offspring population must be of population_size,
         # otherwise we continue generating:
         while len(offspring) < len(population):
+            # An unfinished offspring population is discarded
+            # if the deadline passes:
+            if deadline is not None and deadline.expired():
+                break
             
             # Use tournament selection to choose two
             # chromosomes based on fitness values:
@@ -215,17 +668,44 @@ def genetic_algorithm_solver(
             child_a = __mutation(mutation_rate, child_a)
             child_b = __mutation(mutation_rate, child_b)
 
+            # Repair the child chromosomes if they exceed
+            # the budget:
+            if repair:
+                child_a = __repair(budget, costs, repair_order, child_a)
+                child_b = __repair(budget, costs, repair_order, child_b)
+
             # Add the child chromosomes to the offspring:
             offspring.append(child_a)
             offspring.append(child_b)
         
+        if deadline is not None and deadline.reached:
+            break
+
         # Set the offspring population as the new population:
         population = offspring
 
+        # Stop once the best fitness has stagnated:
+        if stagnation_limit is not None:
+            generation_fitness: int = max(
+                __fitness(budget, costs, utilities, chromosome) for chromosome in population
+            )
+            if generation_fitness > best_fitness:
+                best_fitness = generation_fitness
+                stagnant_generations = 0
+            else:
+                stagnant_generations += 1
+                if stagnant_generations >= stagnation_limit:
+                    break
+
     # Compute the best chromosome found and its fitness value:
     best_chromosome: List[int] = max(population, key=lambda chromosome: __fitness(budget, costs, utilities, chromosome))
     best_fitness: int = __fitness(budget, costs, utilities, best_chromosome)
 
+    # If no chromosome fits the budget, e.g., when the deadline passes
+    # early on, then the empty allocation is the best valid allocation:
+    if best_fitness < 0:
+        return [], 0
+
     # Convert from the binary allocation to project ids:
     allocation: List[int] = [projects[idx] for idx, gene in enumerate(best_chromosome) if gene]
     return allocation, best_fitness
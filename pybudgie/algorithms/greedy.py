@@ -49,7 +49,7 @@ def ratio_greedy_solver(
     
     candidates = sorted(
         [(project, utilities[i], costs[i]) for i, project in enumerate(projects)],
-        key=lambda t: t[1]/t[2],
+        key=lambda t: t[1]/t[2] if t[2] else float('inf'),
         reverse=True
     )
 
@@ -86,3 +86,38 @@ def greedy_solver(
     )
 
     return __run_greedy(budget, candidates)
+
+
+def greedy_budget_sweep(
+        budgets: List[int],
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int],
+        ratio: bool = False
+) -> List[Tuple[List[int], int]]:
+    """
+    Runs the greedy (or ratio greedy) algorithm for each of several budgets,
+    sorting the candidates only once. Since candidates that do not fit are
+    skipped rather than ending the run, each budget still needs its own pass
+    through the sorted candidates.
+
+    Parameters:
+        - budgets (List[int]): The budgets for which to find allocations.
+        - projects (List[int]): A list of project identifiers.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - ratio (bool): Whether to sort the candidates by their utility-weight ratio,
+        as in ratio_greedy_solver, rather than by their utilities.
+
+    Returns:
+        - List[Tuple[List[int], int]]: The allocation and utility for each budget,
+        in the order given.
+    """
+
+    candidates = sorted(
+        [(project, utilities[i], costs[i]) for i, project in enumerate(projects)],
+        key=(lambda t: t[1]/t[2] if t[2] else float('inf')) if ratio else (lambda t: t[1]),
+        reverse=True
+    )
+
+    return [__run_greedy(budget, candidates) for budget in budgets]
@@ -0,0 +1,115 @@
+from .deadline import Deadline
+from typing import List, Tuple, Optional
+
+
+# A state is a (cost, utility, chain) triple, where the chain is a linked
+# list of (project index, parent chain) pairs, such that states created
+# from the same parent share the parent's projects instead of copying them.
+State = Tuple[int, int, Optional[tuple]]
+
+
+def __merge(states: List[State], shifted: List[State]) -> List[State]:
+    """
+    Merges two lists of states, each sorted by increasing cost and increasing
+    utility, into a single list of non-dominated states. A state is dominated
+    if another state costs no more and has at least as much utility.
+
+    Parameters:
+        - states (List[State]): The states excluding the current project.
+        - shifted (List[State]): The states including the current project.
+
+    Returns:
+        - List[State]: The Pareto frontier of the union of both lists, sorted
+        by increasing cost and (strictly) increasing utility.
+    """
+
+    frontier: List[State] = []
+    best_utility: int = -1
+    i: int = 0
+    j: int = 0
+
+    while i < len(states) or j < len(shifted):
+        # Take the cheaper state first, preferring the state with
+        # more utility when the costs are equal:
+        if j == len(shifted) or (i < len(states) and (
+            states[i][0] < shifted[j][0] or
+            (states[i][0] == shifted[j][0] and states[i][1] >= shifted[j][1])
+        )):
+            state = states[i]
+            i += 1
+        else:
+            state = shifted[j]
+            j += 1
+
+        # Since states arrive in order of cost, a state is only
+        # non-dominated if it beats every cheaper state:
+        if state[1] > best_utility:
+            frontier.append(state)
+            best_utility = state[1]
+
+    return frontier
+
+
+def pareto_frontier_solver(
+        budget: int,
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int],
+        deadline: Deadline = None
+) -> Tuple[List[int], int]:
+    """
+    An exact algorithm for participatory budgeting problems formulated as the
+    binary knapsack problem.
+
+    Rather than tabulating every integer budget {0, 1, ..., budget}, we only keep
+    the non-dominated (cost, utility) states, i.e., the Pareto frontier of the
+    allocations found so far. For each project, we shift every state by the cost
+    and utility of the project, drop those exceeding the budget, and merge the
+    shifted states back into the frontier. The run time and memory hence depend
+    on the number of distinct Pareto states rather than the size of the budget,
+    which suits instances with large budgets and relatively few projects.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - projects (List[int]): A list of project identifiers.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - deadline (Deadline): An optional deadline, after which the best allocation
+        of the projects considered so far is returned.
+
+    Returns:
+        - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
+        ids, and the overall value with regard to the welfare function.
+    """
+
+    # The empty allocation is always feasible:
+    states: List[State] = [(0, 0, None)]
+
+    for i in range(len(projects)):
+        if deadline is not None and deadline.expired():
+            break
+
+        # Projects that do not fit the budget or add no utility
+        # can only ever produce dominated states:
+        if costs[i] > budget or utilities[i] <= 0:
+            continue
+
+        # The states are sorted by cost, so we can stop shifting
+        # as soon as a shifted state exceeds the budget:
+        shifted: List[State] = []
+        for cost, utility, chain in states:
+            if cost + costs[i] > budget:
+                break
+            shifted.append((cost + costs[i], utility + utilities[i], (i, chain)))
+
+        states = __merge(states, shifted)
+
+    # The most expensive state on the frontier has the most
+    # utility, so we recover its projects from the chain:
+    _, best_utility, chain = states[-1]
+    allocation: List[int] = []
+    while chain is not None:
+        allocation.append(projects[chain[0]])
+        chain = chain[1]
+
+    return allocation, best_utility
@@ -1,74 +1,146 @@
-from typing import List, Tuple
-from dataclasses import dataclass
+from .deadline import Deadline
+from typing import List, Tuple, Callable
 import numpy as np
 import random
+import math
 
 
-# Ignore Exp Overflow
-np.seterr(over='ignore')
-
-
-@dataclass
-class SAAllocation:
-    # Instance Data
-    budget: int
-    costs: List[int]
-    utilities: List[int]
-
-    # Allocation Data
-    allocation: List[int]  # e.g. [1, 0, 0, 1, 0]
-    utility: int
-    cost: int
-
-    def neighbor(self) -> 'SAAllocation':
-        """
-        Generates a neighbour by randomly flipping a single bit and
-        adding or subtracting the corresponding cost and utility
-        from the allocation totals. Allocations exceeding the
-        instance budget are given a negative utility, such that
-        the default allocation (all zeroes) is better.
-
-        Example:
-        self:      [1, 0, 0, 1, 0]
-        neighbour: [1, 0, 0, 1, 1]
-                                ^
-
-        Returns:
-            - SAAllocation: A neighbouring allocation object.
-        """
-
-        # Create a deep copy of the allocation:
-        _allocation = self.allocation[:]
-        _utility = self.utility
-        _cost = self.cost
-
-        # Generate randomly an index in the allocation and flip
-        # the bit, i.e., include/exclude the item at that index:
-        ridx: int = random.randint(0, len(_allocation) - 1)
-        _allocation[ridx] = int(not _allocation[ridx])
-
-        # Update the utility and cost by setting false bits to
-        # -1 such that it subtracts if the item was excluded:
-        pos_neg = 1 if _allocation[ridx] else -1
-        _utility = abs(_utility) + (pos_neg * self.utilities[ridx])
-        _cost += pos_neg * self.costs[ridx]
-
-        # We negatively value allocations whose costs exceed
-        # the budget. We still preserve its value, and use
-        # abs(_cost) above to update it where one of its
-        # neighbours may reduce the total weight below the
-        # knapsack capacity:
-        if _cost > self.budget:
-            _utility = -_utility
-        
-        return SAAllocation(
-            budget=self.budget,
-            costs=self.costs,
-            utilities=self.utilities,
-            allocation=_allocation,
-            utility=_utility,
-            cost=_cost
-        )
+def __transfer(idx: int, source: List[int], destination: List[int], positions: List[int]) -> None:
+    """
+    Moves a project index from one unordered list of indexes to another in constant
+    time, by moving the last index of the source list into its place.
+
+    Parameters:
+        - idx (int): The index of the project to move.
+        - source (List[int]): The list of indexes containing the project.
+        - destination (List[int]): The list of indexes to which the project is appended.
+        - positions (List[int]): The position of every project in its list, which is updated.
+    """
+    last: int = source.pop()
+    if last != idx:
+        source[positions[idx]] = last
+        positions[last] = positions[idx]
+    positions[idx] = len(destination)
+    destination.append(idx)
+
+
+def __batched_step(
+        rng: np.random.Generator,
+        budget: int,
+        costs: np.ndarray,
+        utilities: np.ndarray,
+        allocations: np.ndarray,
+        utility: np.ndarray,
+        cost: np.ndarray,
+        temperatures: np.ndarray,
+        metropolis: bool = False
+) -> None:
+    """
+    Proposes and decides a single-bit flip for every chain at once, with the
+    same negative utility for allocations exceeding the budget and the same
+    acceptance rule as the scalar kernel, and applies the accepted flips in place.
+
+    Parameters:
+        - rng (np.random.Generator): The random number generator to use.
+        - budget (int): The total budget of the instance.
+        - costs (np.ndarray): The costs of the projects in the instance.
+        - utilities (np.ndarray): The utilities of the projects in the instance.
+        - allocations (np.ndarray): A boolean matrix with one allocation per chain.
+        - utility (np.ndarray): The (signed) utility of each chain's allocation.
+        - cost (np.ndarray): The total cost of each chain's allocation.
+        - temperatures (np.ndarray): The current temperature of each chain.
+        - metropolis (bool): Whether to accept worse allocations with the Metropolis
+        probability exp(delta / T) instead, such that the temperature of each chain
+        controls how far it strays from good allocations.
+    """
+
+    num_chains, n_projects = allocations.shape
+    chains: np.ndarray = np.arange(num_chains)
+
+    # Each chain flips one random bit, where pos_neg is
+    # -1 if the project would be excluded:
+    ridx: np.ndarray = rng.integers(n_projects, size=num_chains)
+    pos_neg: np.ndarray = np.where(allocations[chains, ridx], -1, 1)
+
+    neighbor_cost: np.ndarray = cost + pos_neg * costs[ridx]
+    neighbor_utility: np.ndarray = np.abs(utility) + pos_neg * utilities[ridx]
+    neighbor_utility = np.where(neighbor_cost > budget, -neighbor_utility, neighbor_utility)
+    delta_utility: np.ndarray = neighbor_utility - utility
+
+    # Better allocations are always accepted, and worse
+    # allocations with probability p, where the division
+    # may overflow once a temperature has cooled to zero:
+    q: np.ndarray = rng.random(num_chains)
+    with np.errstate(divide='ignore', over='ignore'):
+        if metropolis:
+            p: np.ndarray = np.exp(np.minimum(delta_utility / temperatures, 0.0))
+        else:
+            p: np.ndarray = np.exp(np.minimum(-delta_utility / temperatures, 700.0))
+    accepted: np.ndarray = (delta_utility >= 0) | (q < p)
+
+    allocations[chains[accepted], ridx[accepted]] ^= True
+    utility[accepted] = neighbor_utility[accepted]
+    cost[accepted] = neighbor_cost[accepted]
+
+
+def __batched_solver(
+        budget: int,
+        costs: np.ndarray,
+        utilities: np.ndarray,
+        chains: int,
+        initial_temperature: float,
+        temperature_length: int,
+        cooling_ratio: float,
+        num_non_improve: int,
+        deadline: Deadline = None,
+        progress: Callable[[np.ndarray, int], None] = None
+) -> Tuple[int, np.ndarray]:
+    """
+    Runs independent annealing chains at once, holding their allocations as
+    a boolean matrix, until num_non_improve steps pass without any chain
+    improving on the best allocation found. See simulated_annealing_solver
+    for the parameters, where progress is called with the bits of each new
+    best allocation.
+
+    Returns:
+        - Tuple[int, np.ndarray]: The utility and bits of the best allocation
+        found by any chain.
+    """
+
+    rng: np.random.Generator = np.random.default_rng()
+
+    # Every chain starts from the empty allocation:
+    allocations: np.ndarray = np.zeros((chains, len(costs)), dtype=bool)
+    utility: np.ndarray = np.zeros(chains, dtype=np.int64)
+    cost: np.ndarray = np.zeros(chains, dtype=np.int64)
+    temperatures: np.ndarray = np.full(chains, initial_temperature, dtype=np.float64)
+
+    best_allocation: np.ndarray = allocations[0].copy()
+    best_utility: int = 0
+    count_num_non_improve: int = 0
+
+    # As long as some chain has improved within the deadline:
+    while count_num_non_improve < num_non_improve:
+        if deadline is not None and deadline.expired():
+            break
+
+        for _ in range(temperature_length):
+            __batched_step(rng, budget, costs, utilities, allocations, utility, cost, temperatures)
+            count_num_non_improve += 1
+
+            # Update best_allocation if any chain found a better one:
+            best_chain: int = int(np.argmax(utility))
+            if utility[best_chain] > best_utility:
+                best_allocation = allocations[best_chain].copy()
+                best_utility = int(utility[best_chain])
+                # We have improved, so reset the count:
+                count_num_non_improve = 0
+                if progress is not None:
+                    progress(best_allocation, best_utility)
+
+        temperatures *= cooling_ratio
+
+    return best_utility, best_allocation
 
 
 def simulated_annealing_solver(
@@ -79,7 +151,12 @@ def simulated_annealing_solver(
         initial_temperature: float = 10.0,
         temperature_length: int = 1,
         cooling_ratio: float = 0.999,
-        num_non_improve: int = 100_000
+        num_non_improve: int = 100_000,
+        deadline: Deadline = None,
+        chains: int = 1,
+        swap_probability: float = 0.0,
+        drop_add_probability: float = 0.0,
+        progress: Callable[[List[int], int], None] = None
 ) -> Tuple[List[int], int]:
     """
     A relatively fast approximation scheme for participatory budgeting
@@ -96,6 +173,20 @@ def simulated_annealing_solver(
     record the best solution found throughout annealing and return it
     at the end.
 
+    Each move flips a single bit of the allocation in place, and we
+    compute its change in cost and utility in constant time before
+    accepting it, so no objects are created per step. We only copy
+    the allocation when the best allocation improves.
+
+    Near the budget, most single flips exceed it, so the scalar kernel may
+    also swap a funded project for an unfunded project, or drop a funded
+    project and greedily add the unfunded projects with the highest
+    utility-cost ratio that still fit, which mostly yield feasible allocations.
+
+    With more than one chain, we run independent chains at once with NumPy,
+    proposing and accepting a move for every chain per step as array operations,
+    and return the best allocation found by any chain.
+
     Parameters:
         - budget (int): The total budget of the instance.
         - projects (List[int]): A list of projects included in the instance.
@@ -105,6 +196,16 @@ def simulated_annealing_solver(
         - temperature_length (int): An optional temperature length parameter for simulated annealing.
         - cooling_ratio (float): An optional cooling ratio parameter for simulated annealing.
         - num_non_improve (int): An optional num-non-improve parameter for simulated annealing.
+        - deadline (Deadline): An optional deadline, after which the best allocation
+        found so far is returned.
+        - chains (int): The number of independent chains to run at once. One means
+        the scalar kernel.
+        - swap_probability (float): The probability of each move of the scalar kernel
+        being a swap of a funded project for an unfunded project.
+        - drop_add_probability (float): The probability of each move of the scalar kernel
+        dropping a funded project and greedily adding unfunded projects.
+        - progress (Callable[[List[int], int], None]): An optional function called with
+        each new best allocation, as a list of project ids, and its utility.
 
     Returns:
         - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
@@ -113,47 +214,275 @@ def simulated_annealing_solver(
 
     current_temperature: float = initial_temperature
     count_num_non_improve: int = 0
+    n_projects: int = len(costs)
+
+    if n_projects == 0:
+        return [], 0
+
+    if chains > 1:
+        best_utility, best_allocation = __batched_solver(
+            budget=budget,
+            costs=np.array(costs, dtype=np.int64),
+            utilities=np.array(utilities, dtype=np.int64),
+            chains=chains,
+            initial_temperature=initial_temperature,
+            temperature_length=temperature_length,
+            cooling_ratio=cooling_ratio,
+            num_non_improve=num_non_improve,
+            deadline=deadline,
+            progress=None if progress is None else lambda bits, utility: progress(
+                [projects[idx] for idx in np.flatnonzero(bits)], utility
+            )
+        )
+        return [projects[idx] for idx in np.flatnonzero(best_allocation)], best_utility
 
-    # The initial allocation is the empty allocation,
+    # The initial allocation is the empty allocation, e.g. [0, 0, 0],
     # with no utility and no cost.
-    current_allocation: SAAllocation = SAAllocation(
-        budget=budget,
-        costs=costs,
-        utilities=utilities,
-        allocation=[0] * len(costs),
-        utility=0,
-        cost=0
-    )
-    best_allocation: SAAllocation = current_allocation
+    allocation: List[int] = [0] * n_projects
+    utility: int = 0
+    cost: int = 0
+
+    best_allocation: List[int] = allocation[:]
+    best_utility: int = 0
+
+    # Drop-add moves add projects in decreasing order of their
+    # utility-cost ratio, where projects costing nothing come first:
+    local_moves: bool = swap_probability > 0 or drop_add_probability > 0
+    add_order: List[int] = sorted(
+        range(n_projects),
+        key=lambda i: utilities[i] / costs[i] if costs[i] else float('inf'),
+        reverse=True
+    ) if local_moves else []
+
+    # The cheapest cost from each point of add_order onwards, such
+    # that a drop-add move stops once nothing further can fit:
+    cheapest: List[int] = [costs[idx] for idx in add_order]
+    for k in range(len(cheapest) - 2, -1, -1):
+        cheapest[k] = min(cheapest[k], cheapest[k + 1])
+
+    # Local moves sample funded and unfunded projects from lists of
+    # their indexes, which accepted moves update in constant time:
+    funded: List[int] = []
+    unfunded: List[int] = list(range(n_projects)) if local_moves else []
+    positions: List[int] = list(range(n_projects)) if local_moves else []
 
     # As long as we have improved within the deadline:
     while count_num_non_improve < num_non_improve:
+        if deadline is not None and deadline.expired():
+            break
+
         for _ in range(temperature_length):
-            # Generate a neighbour and compare utilities:
-            neighbor_allocation: SAAllocation = current_allocation.neighbor()
-            delta_utility: int = neighbor_allocation.utility - current_allocation.utility
-
-            # A better allocation instantly becomes current:
-            if delta_utility >= 0:
-                current_allocation = neighbor_allocation
-                count_num_non_improve += 1
+            # We only draw the move type if there is a choice, such
+            # that single flips consume the same random numbers:
+            move: float = random.random() if local_moves else 1.0
+            moved: List[int] = None
+
+            # Swap a funded project for an unfunded project:
+            if move < swap_probability and funded and unfunded:
+                ridx: int = funded[random.randrange(len(funded))]
+                added: int = unfunded[random.randrange(len(unfunded))]
+                moved = [ridx, added]
+                neighbor_cost: int = cost - costs[ridx] + costs[added]
+                neighbor_utility: int = abs(utility) - utilities[ridx] + utilities[added]
+
+            # Drop a funded project, and greedily add those unfunded
+            # projects which fit the remaining budget:
+            elif move < swap_probability + drop_add_probability and funded:
+                ridx: int = funded[random.randrange(len(funded))]
+                moved = [ridx]
+                neighbor_cost: int = cost - costs[ridx]
+                neighbor_utility: int = abs(utility) - utilities[ridx]
+                for k, added in enumerate(add_order):
+                    if budget - neighbor_cost < cheapest[k]:
+                        break
+                    if not allocation[added] and added != ridx and \
+                            neighbor_cost + costs[added] <= budget:
+                        moved.append(added)
+                        neighbor_cost += costs[added]
+                        neighbor_utility += utilities[added]
+
+            # Choose randomly an index in the allocation whose bit to
+            # flip, i.e., include/exclude the item at that index, where
+            # pos_neg is -1 if the item would be excluded:
+            else:
+                ridx: int = random.randrange(n_projects)
+                pos_neg: int = -1 if allocation[ridx] else 1
+                neighbor_cost: int = cost + pos_neg * costs[ridx]
+                neighbor_utility: int = abs(utility) + pos_neg * utilities[ridx]
+
+            # We negatively value allocations whose costs exceed the
+            # budget, but preserve their magnitude with abs(utility),
+            # such that one of its neighbours may reduce the total
+            # cost below the budget:
+            if neighbor_cost > budget:
+                neighbor_utility = -neighbor_utility
+
+            delta_utility: int = neighbor_utility - utility
+
+            # A better allocation instantly becomes current. Otherwise,
+            # accept worse allocation with probability p, where we clamp
+            # the exponent rather than overflow:
+            accepted: bool = delta_utility >= 0 or random.random() < math.exp(
+                min(-delta_utility / current_temperature, 700.0)
+            )
+            count_num_non_improve += 1
+
+            if accepted:
+                if moved is None:
+                    allocation[ridx] ^= 1
+                else:
+                    for idx in moved:
+                        allocation[idx] ^= 1
+
+                # The lists of funded and unfunded projects are only
+                # kept for local moves:
+                if local_moves:
+                    for idx in moved or (ridx,):
+                        if allocation[idx]:
+                            __transfer(idx, unfunded, funded, positions)
+                        else:
+                            __transfer(idx, funded, unfunded, positions)
+
+                utility = neighbor_utility
+                cost = neighbor_cost
+
                 # Update best_allocation if it is the best:
-                if current_allocation.utility > best_allocation.utility:
-                    best_allocation = current_allocation
+                if utility > best_utility:
+                    best_allocation = allocation[:]
+                    best_utility = utility
                     # We have improved, so reset the count:
                     count_num_non_improve = 0
-
-            # Otherwise, accept worse allocation with probability p:
-            else:
-                q = random.random()
-                p = np.exp(-delta_utility / current_temperature)
-                if q < p:
-                    current_allocation = neighbor_allocation
-                count_num_non_improve += 1
+                    if progress is not None:
+                        progress([projects[idx] for idx, val in enumerate(best_allocation) if val], best_utility)
         
         # After temperature_length iterations, update the temperature:
         current_temperature *= cooling_ratio
     
     # Record the project ids of those projects in the best allocation:
-    result = [projects[idx] for idx, val in enumerate(best_allocation.allocation) if val]
-    return result, best_allocation.utility
+    result = [projects[idx] for idx, val in enumerate(best_allocation) if val]
+    return result, best_utility
+
+
+def parallel_tempering_solver(
+        budget: int,
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int],
+        replicas: int = 16,
+        min_temperature: float = None,
+        max_temperature: float = None,
+        swap_interval: int = 10,
+        num_non_improve: int = 100_000,
+        deadline: Deadline = None,
+        progress: Callable[[List[int], int], None] = None
+) -> Tuple[List[int], int]:
+    """
+    A relatively fast approximation scheme for participatory budgeting
+    problems formulated as the binary knapsack problem, which replaces the
+    cooling schedule of simulated annealing with replica exchange:
+
+    We run replicas of the allocation at a geometric ladder of fixed
+    temperatures, where each replica flips single bits and accepts worse
+    allocations with the Metropolis probability at its temperature. Every
+    swap_interval steps, adjacent replicas exchange their allocations with
+    probability min(1, exp((u_j - u_i) * (1 / T_i - 1 / T_j))), such that
+    good allocations drift towards the cold replicas to be refined, while
+    the hot replicas keep exploring. As every temperature is always present,
+    the result is far less sensitive to the choice of temperatures than to
+    the initial temperature of annealing.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - projects (List[int]): A list of projects included in the instance.
+        - costs (List[int]): A list of costs for each project in the instance.
+        - utilities (List[int]): A list of utilities for each project in the instance.
+        - replicas (int): The number of replicas, i.e., temperatures in the ladder.
+        - min_temperature (float): The temperature of the coldest replica, which defaults
+        to a hundredth of the smallest positive utility.
+        - max_temperature (float): The temperature of the hottest replica, which defaults
+        to the largest utility.
+        - swap_interval (int): The number of steps between exchanges of adjacent replicas.
+        - num_non_improve (int): The number of steps without any replica improving on the
+        best allocation found, after which we stop.
+        - deadline (Deadline): An optional deadline, after which the best allocation
+        found so far is returned.
+        - progress (Callable[[List[int], int], None]): An optional function called with
+        each new best allocation, as a list of project ids, and its utility.
+
+    Returns:
+        - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
+        ids, and the overall value with regard to the welfare function.
+    """
+
+    positive_utilities: List[int] = [utility for utility in utilities if utility > 0]
+    if not positive_utilities:
+        return [], 0
+
+    if max_temperature is None:
+        max_temperature = float(max(positive_utilities))
+    if min_temperature is None:
+        min_temperature = min(positive_utilities) / 100
+    replicas = max(replicas, 2)
+
+    costs_array: np.ndarray = np.array(costs, dtype=np.int64)
+    utilities_array: np.ndarray = np.array(utilities, dtype=np.int64)
+    rng: np.random.Generator = np.random.default_rng()
+
+    # The geometric ladder, from the coldest to the hottest replica:
+    temperatures: np.ndarray = np.geomspace(min_temperature, max_temperature, replicas)
+    betas: np.ndarray = 1 / temperatures
+
+    # Every replica starts from the empty allocation:
+    allocations: np.ndarray = np.zeros((replicas, len(costs)), dtype=bool)
+    utility: np.ndarray = np.zeros(replicas, dtype=np.int64)
+    cost: np.ndarray = np.zeros(replicas, dtype=np.int64)
+
+    best_allocation: np.ndarray = allocations[0].copy()
+    best_utility: int = 0
+    count_num_non_improve: int = 0
+    step: int = 0
+
+    while count_num_non_improve < num_non_improve:
+        if deadline is not None and deadline.expired():
+            break
+
+        __batched_step(
+            rng, budget, costs_array, utilities_array,
+            allocations, utility, cost, temperatures, metropolis=True
+        )
+        step += 1
+        count_num_non_improve += 1
+
+        # Update best_allocation if any replica found a better one:
+        best_replica: int = int(np.argmax(utility))
+        if utility[best_replica] > best_utility:
+            best_allocation = allocations[best_replica].copy()
+            best_utility = int(utility[best_replica])
+            # We have improved, so reset the count:
+            count_num_non_improve = 0
+            if progress is not None:
+                progress([projects[idx] for idx in np.flatnonzero(best_allocation)], best_utility)
+
+        if step % swap_interval:
+            continue
+
+        # We alternate between exchanging the even and odd pairs
+        # of adjacent replicas, such that each pair is disjoint:
+        lower: np.ndarray = np.arange((step // swap_interval) % 2, replicas - 1, 2)
+        upper: np.ndarray = lower + 1
+        with np.errstate(over='ignore'):
+            p: np.ndarray = np.exp(np.minimum(
+                (utility[upper] - utility[lower]) * (betas[lower] - betas[upper]), 0.0
+            ))
+        swapped: np.ndarray = rng.random(len(lower)) < p
+
+        # The temperatures stay in place, while the
+        # allocations move along the ladder:
+        order: np.ndarray = np.arange(replicas)
+        order[lower[swapped]] = upper[swapped]
+        order[upper[swapped]] = lower[swapped]
+        allocations[:] = allocations[order]
+        utility[:] = utility[order]
+        cost[:] = cost[order]
+
+    return [projects[idx] for idx in np.flatnonzero(best_allocation)], best_utility
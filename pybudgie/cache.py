@@ -0,0 +1,139 @@
+from .result import PBResult
+from collections import OrderedDict
+from typing import List, Optional
+import dataclasses
+import hashlib
+import pickle
+import os
+
+
+class PBResultCache:
+    def __init__(self, max_size: int = 128, path: str = None) -> None:
+        """
+        Constructs a least-recently-used cache of results, keyed by a hash of the
+        flattened instance together with the algorithm and its parameters, such that
+        identical instances are only solved once, e.g., the same pabulib file after
+        an edit to its metadata.
+
+        Parameters:
+            - max_size (int): The maximum number of results held in memory, after which
+            the least recently used result is evicted.
+            - path (str): An optional directory in which every result is also stored as
+            a pickle file, such that the cache persists between processes. Results found
+            there are moved into memory. The directory is not limited in size.
+        """
+
+        self.max_size: int = max_size
+        self.path: Optional[str] = path
+        self.hits: int = 0
+        self.misses: int = 0
+        self.__results: OrderedDict = OrderedDict()  # Key -> PBResult
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.__results)
+
+    @staticmethod
+    def key(
+            budget: int,
+            projects: List[str],
+            costs: List[int],
+            utilities: List[int],
+            algorithm: str,
+            **parameters
+    ) -> str:
+        """
+        Parameters:
+            - budget (int): The total budget of the instance.
+            - projects (List[str]): A list of project identifiers.
+            - costs (List[int]): A list of project costs.
+            - utilities (List[int]): A list of project utilities.
+            - algorithm (str): The name of the algorithm.
+            - parameters: Any parameters which change the result of the algorithm.
+
+        Returns:
+            - str: The SHA-256 digest of the flattened instance, the algorithm and its
+            parameters, in hexadecimal.
+        """
+        content: tuple = (budget, projects, costs, utilities, algorithm, sorted(parameters.items()))
+        return hashlib.sha256(pickle.dumps(content, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+    def get(self, key: str) -> Optional[PBResult]:
+        """
+        Parameters:
+            - key (str): The key of the result, see PBResultCache.key.
+
+        Returns:
+            - Optional[PBResult]: A copy of the cached result, or None if there is none.
+        """
+
+        result: PBResult = self.__results.get(key)
+        if result is not None:
+            self.__results.move_to_end(key)
+        elif self.path is not None:
+            result = self.__load(key)
+            if result is not None:
+                self.__insert(key, result)
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return dataclasses.replace(result, allocation=list(result.allocation), stats=dict(result.stats))
+
+    def put(self, key: str, result: PBResult) -> None:
+        """
+        Stores a copy of a result in memory, and on disk if the cache has a path,
+        such that the caller may modify the result without changing the cache.
+
+        Parameters:
+            - key (str): The key of the result, see PBResultCache.key.
+            - result (PBResult): The result to store.
+        """
+
+        result = dataclasses.replace(result, allocation=list(result.allocation), stats=dict(result.stats))
+        self.__insert(key, result)
+        if self.path is not None:
+            self.__store(key, result)
+
+    def clear(self) -> None:
+        """
+        Removes every result from memory and from disk, and resets the counts.
+        """
+
+        self.__results.clear()
+        self.hits = self.misses = 0
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith('.pickle'):
+                    os.remove(os.path.join(self.path, name))
+
+    def __insert(self, key: str, result: PBResult) -> None:
+        self.__results[key] = result
+        self.__results.move_to_end(key)
+        while len(self.__results) > self.max_size:
+            self.__results.popitem(last=False)
+
+    def __load(self, key: str) -> Optional[PBResult]:
+        try:
+            with open(os.path.join(self.path, f'{key}.pickle'), 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def __store(self, key: str, result: PBResult) -> None:
+        import tempfile
+
+        # We write to a temporary file and rename it, such that other
+        # processes never read a partially written result:
+        descriptor, temporary = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, os.path.join(self.path, f'{key}.pickle'))
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from typing import List
+import os
+
+
+# Calibrated constants for the engines, measured with the NumPy
+# engines on a single core and rounded up:
+DP_NS_PER_CELL: float = 4.0
+SA_BASE_MS: float = 250.0
+SA_MS_PER_PROJECT: float = 0.6
+GREEDY_NS_PER_PROJECT: float = 1_500.0
+
+# The bytes held per column of the dynamic programming row, i.e.,
+# the int64 row itself, the boolean mask and its packed copy:
+DP_BYTES_PER_COLUMN: float = 8 + 1 + 1 / 8
+
+# The bytes held per project by the heuristics, e.g., the lists of
+# costs and utilities and the allocation of simulated annealing:
+BYTES_PER_PROJECT: int = 256
+
+
+@dataclass
+class PBEstimate:
+    # The name of the PBAlgorithm member the estimate is for:
+    algorithm: str
+
+    # The estimated runtime in milliseconds, which is the minimum
+    # runtime for anytime algorithms:
+    time_ms: float
+
+    # The estimated peak memory in bytes:
+    memory_bytes: int
+
+    # Whether the algorithm finds an optimal allocation:
+    exact: bool
+
+
+def available_memory() -> int:
+    """
+    Returns:
+        - int: The physical memory of the machine in bytes, or 1 GiB if this is
+        not available on the platform.
+    """
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return 1 << 30
+
+
+def __dp_estimate(algorithm: str, n_projects: int, columns: int, exact: bool) -> PBEstimate:
+    """
+    Parameters:
+        - algorithm (str): The name of the algorithm.
+        - n_projects (int): The number of rows of the table.
+        - columns (int): The number of columns of the table.
+        - exact (bool): Whether the algorithm finds an optimal allocation.
+
+    Returns:
+        - PBEstimate: The estimate for a table with a rolling row and one packed
+        bit of decisions per cell.
+    """
+    return PBEstimate(
+        algorithm=algorithm,
+        time_ms=DP_NS_PER_CELL * n_projects * columns / 1_000_000,
+        memory_bytes=int(n_projects * columns / 8 + DP_BYTES_PER_COLUMN * columns),
+        exact=exact
+    )
+
+
+def estimate(
+        budget: int,
+        costs: List[int],
+        utilities: List[int],
+        epsilon: float = 0.1
+) -> List[PBEstimate]:
+    """
+    Estimates the runtime and memory of each engine from calibrated constants.
+
+    The dynamic programming table has a column for every budget from zero to the budget,
+    or for every total utility, whichever is fewer, see table_columns. The FPTAS
+    scales the utilities down such that their total is at most n^2 / epsilon.
+    Branch and bound and the genetic algorithm are not modelled, since the runtime of
+    branch and bound depends on the instance rather than its size.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+        - epsilon (float): The approximation parameter of the FPTAS.
+
+    Returns:
+        - List[PBEstimate]: The estimates of the dynamic programming solver, the FPTAS,
+        simulated annealing and the greedy algorithm.
+    """
+    from .algorithms import table_columns
+
+    n_projects: int = len(costs)
+    columns, _ = table_columns(budget, costs, utilities)
+    total_utility: int = sum(utility for utility in utilities if utility > 0)
+    scale: float = max(1.0, epsilon * max(utilities, default=0) / max(n_projects, 1))
+
+    return [
+        __dp_estimate('DYNAMIC_PROGRAMMING', n_projects, columns, True),
+        __dp_estimate('FPTAS', n_projects, int(total_utility / scale) + 1, False),
+        PBEstimate(
+            algorithm='SIMULATED_ANNEALING',
+            time_ms=SA_BASE_MS + SA_MS_PER_PROJECT * n_projects,
+            memory_bytes=BYTES_PER_PROJECT * n_projects,
+            exact=False
+        ),
+        PBEstimate(
+            algorithm='GREEDY',
+            time_ms=GREEDY_NS_PER_PROJECT * n_projects / 1_000_000,
+            memory_bytes=BYTES_PER_PROJECT * n_projects,
+            exact=False
+        )
+    ]
+
+
+def select(
+        estimates: List[PBEstimate],
+        time_limit_ms: float = None,
+        memory_limit_bytes: int = None
+) -> PBEstimate:
+    """
+    Selects an algorithm from the estimates, in order of preference: an exact algorithm
+    expected to finish within the time limit, then the FPTAS, then simulated annealing,
+    which returns its best allocation at the time limit. Only algorithms that fit the
+    memory limit are considered, and greedy is the last resort.
+
+    Parameters:
+        - estimates (List[PBEstimate]): The estimates of each algorithm.
+        - time_limit_ms (float): The latency target in milliseconds, if any.
+        - memory_limit_bytes (int): The memory available to the algorithm in bytes,
+        which defaults to half of the physical memory.
+
+    Returns:
+        - PBEstimate: The estimate of the selected algorithm.
+    """
+
+    if memory_limit_bytes is None:
+        memory_limit_bytes = available_memory() // 2
+
+    def fits(estimate: PBEstimate) -> bool:
+        return estimate.memory_bytes <= memory_limit_bytes and \
+            (time_limit_ms is None or estimate.time_ms <= time_limit_ms)
+
+    # The exact algorithms and the FPTAS are only useful
+    # if they finish, whereas the heuristics are anytime:
+    for preferred in ('DYNAMIC_PROGRAMMING', 'FPTAS'):
+        candidates: List[PBEstimate] = [e for e in estimates if e.algorithm == preferred and fits(e)]
+        if candidates:
+            return min(candidates, key=lambda e: e.time_ms)
+
+    for anytime in ('SIMULATED_ANNEALING', 'GREEDY'):
+        candidates: List[PBEstimate] = [
+            e for e in estimates if e.algorithm == anytime and e.memory_bytes <= memory_limit_bytes
+        ]
+        if candidates:
+            return candidates[0]
+
+    return min(estimates, key=lambda e: e.memory_bytes)
@@ -1,6 +1,7 @@
 from .project import PBProject
 from .voter import PBVoter
-from typing import List, Dict
+from typing import List, Dict, Tuple
+from collections import defaultdict
 
 
 class PBVoter:
@@ -73,8 +74,27 @@ class PBInstance:
         self.district = district
         self.categories = [] if not categories else categories
         self.budget = budget
-        self._projects = {} if not projects else {project.id: project for project in projects}
-        self._voters = {} if not voters else {voter.id: voter for voter in voters}
+        self._projects = {}
+        self._voters = {}
+
+        # The total utility of each project over all the voters, including
+        # projects not (yet) in the instance, which is kept up to date as
+        # voters are added and removed:
+        self._utility_totals: Dict[int, int] = defaultdict(int)
+
+        # A copy of the utilities of each voter as they were counted,
+        # which are subtracted when the voter is replaced or removed:
+        self._ballots: Dict[int, Dict[int, int]] = {}
+
+        # The cached result of tallies(), which is patched in place
+        # for each ballot and rebuilt when the projects change:
+        self._tallies: Tuple[List[int], List[int], List[int], Dict[int, int]] = None
+        self._version: int = 0
+
+        for project in projects or []:
+            self.add_project(project)
+        for voter in voters or []:
+            self.add_voter(voter)
     
     # --- Projects ---
     @property
@@ -101,6 +121,8 @@ class PBInstance:
             - project (PBProject): A PBProject object to add to the instance.
         """
         self._projects[project.id] = project
+        self._tallies = None
+        self._version += 1
 
     def remove_project(self, project_id: PBProject) -> None:
         """
@@ -110,6 +132,8 @@ class PBInstance:
         """
         if project_id in self._projects:
             self._projects.pop(project_id)
+            self._tallies = None
+            self._version += 1
 
     # --- Voters ---
     @property
@@ -135,7 +159,13 @@ class PBInstance:
         Parameters:
             - voter (PBVoter): A PBVoter object to add to the instance.
         """
+        # A voter with the same id replaces their previous ballot, even if
+        # it is the same PBVoter object whose utilities have been modified:
+        if voter.id in self._ballots:
+            self.__tally(self._ballots[voter.id], -1)
         self._voters[voter.id] = voter
+        self._ballots[voter.id] = dict(voter.utilities)
+        self.__tally(self._ballots[voter.id], 1)
 
     def remove_voter(self, voter_id: PBVoter) -> None:
         """
@@ -145,6 +175,58 @@ class PBInstance:
         """
         if voter_id in self._voters:
             self._voters.pop(voter_id)
+            self.__tally(self._ballots.pop(voter_id), -1)
+
+    # --- Tallies ---
+    @property
+    def version(self) -> int:
+        """
+        Returns:
+            - int: A counter which increases whenever a project or voter is added
+            or removed, such that results computed from the instance can be reused
+            for as long as it is unchanged.
+        """
+        return self._version
+
+    def tallies(self) -> Tuple[List[int], List[int], List[int]]:
+        """
+        Aggregates the utilities of all the voters for each project by utilitarian
+        welfare, i.e., the same as PBWelfare.UTILITARIAN.flatten, without a pass over
+        every vote. The totals are maintained by add_voter and remove_voter, so a
+        ballot costs O(ballot size) and only a change of projects costs O(projects).
+        The utilities of a voter are counted when it is added, so a voter whose
+        utilities are modified must be added again, which replaces their ballot.
+
+        Returns:
+            - Tuple[List[int], List[int], List[int]]: Copies of the project ids, costs and
+            total utilities of the projects in the instance, such that later ballots do not
+            change the lists held by a solve which is still running.
+        """
+
+        if self._tallies is None:
+            projects: List[int] = list(self._projects.keys())
+            self._tallies = (
+                projects,
+                [project.cost for project in self._projects.values()],
+                [self._utility_totals.get(project_id, 0) for project_id in projects],
+                {project_id: idx for idx, project_id in enumerate(projects)}
+            )
+        return list(self._tallies[0]), list(self._tallies[1]), list(self._tallies[2])
+
+    def __tally(self, ballot: Dict[int, int], sign: int) -> None:
+        """
+        Adds (or subtracts) the utilities of a ballot to the totals of the projects,
+        and patches the cached tallies in place.
+
+        Parameters:
+            - ballot (Dict[int, int]): The utilities of a voter as they were counted.
+            - sign (int): One to add the utilities, or -1 to subtract them.
+        """
+        for project_id, utility in ballot.items():
+            self._utility_totals[project_id] += sign * utility
+            if self._tallies is not None and project_id in self._tallies[3]:
+                self._tallies[2][self._tallies[3][project_id]] += sign * utility
+        self._version += 1
 
     # --- Dunder ---
     def __str__(self) -> str:
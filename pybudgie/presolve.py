@@ -0,0 +1,159 @@
+from .algorithms import ratio_greedy_solver
+from dataclasses import dataclass, field
+from typing import List, Tuple, Dict
+import math
+
+
+@dataclass
+class PBPresolved:
+    # The budget of the core problem, i.e., the budget left after
+    # the fixed projects, divided by the GCD of the core costs:
+    budget: int
+
+    # The projects of the core problem, with their costs divided
+    # by the GCD and their utilities unchanged:
+    projects: List[int]
+    costs: List[int]
+    utilities: List[int]
+
+    # The projects fixed into every allocation, and their utility:
+    fixed_projects: List[int] = field(default_factory=list)
+    fixed_utility: int = 0
+
+    # The greedy allocation of the original problem, which the result
+    # is compared against, since projects are fixed relative to it:
+    incumbent: List[int] = field(default_factory=list)
+    incumbent_utility: int = 0
+
+    # The number of projects removed and fixed by each reduction:
+    stats: Dict[str, int] = field(default_factory=dict)
+
+
+def presolve(
+        budget: int,
+        projects: List[int],
+        costs: List[int],
+        utilities: List[int]
+) -> PBPresolved:
+    """
+    Reduces a participatory budgeting problem, formulated as the binary knapsack
+    problem, to a smaller core problem for the solvers:
+
+    Projects without utility are removed, as are projects costing more than the
+    budget, and projects costing nothing are fixed into the allocation. We then
+    find a greedy incumbent, and fix each remaining project in (or out) if the LP
+    bound of every allocation excluding (or including) it cannot beat the incumbent.
+    The bound for each project follows from the LP relaxation in O(1), as in the
+    reduction of Dembo and Hammer, and is compared in integer arithmetic. Finally,
+    the core costs and the budget are divided by the GCD of the core costs.
+
+    Any allocation better than the incumbent agrees with every fixed project, so
+    the better of the incumbent and the optimum of the core is optimal; see postsolve.
+
+    Parameters:
+        - budget (int): The total budget of the instance.
+        - projects (List[int]): A list of project identifiers.
+        - costs (List[int]): A list of project costs.
+        - utilities (List[int]): A list of project utilities.
+
+    Returns:
+        - PBPresolved: The core problem, and what is needed to map its allocation back.
+    """
+
+    stats: Dict[str, int] = {'removed': 0, 'fixed_in': 0, 'fixed_out': 0}
+    fixed: List[int] = []
+    candidates: List[int] = []
+
+    for i in range(len(projects)):
+        if utilities[i] <= 0 or costs[i] > budget:
+            stats['removed'] += 1
+        elif costs[i] == 0:
+            fixed.append(i)
+            stats['fixed_in'] += 1
+        else:
+            candidates.append(i)
+
+    fixed_utility: int = sum(utilities[i] for i in fixed)
+    incumbent, incumbent_utility = ratio_greedy_solver(
+        budget=budget,
+        projects=candidates,
+        costs=[costs[i] for i in candidates],
+        utilities=[utilities[i] for i in candidates]
+    )
+    incumbent = [projects[i] for i in fixed + incumbent]
+    incumbent_utility += fixed_utility
+
+    # The LP relaxation takes the candidates in decreasing order
+    # of their utility-cost ratio, up to the critical project s,
+    # which only fits fractionally:
+    candidates.sort(key=lambda i: utilities[i] / costs[i], reverse=True)
+    remaining: int = budget
+    lp_utility: int = fixed_utility
+    critical: int = len(candidates)
+    for position, i in enumerate(candidates):
+        if costs[i] > remaining:
+            critical = position
+            break
+        remaining -= costs[i]
+        lp_utility += utilities[i]
+
+    # With u_s / c_s the ratio of the critical project, forcing project
+    # j the other way lowers the LP bound by |u_j - c_j u_s / c_s|, and we
+    # multiply through by c_s to compare the bounds in integers:
+    if critical < len(candidates):
+        critical_utility: int = utilities[candidates[critical]]
+        critical_cost: int = costs[candidates[critical]]
+    else:
+        critical_utility, critical_cost = 0, 1
+    scaled_bound: int = lp_utility * critical_cost + critical_utility * remaining
+    target: int = (incumbent_utility + 1) * critical_cost
+
+    core: List[int] = []
+    for position, i in enumerate(candidates):
+        loss: int = abs(utilities[i] * critical_cost - critical_utility * costs[i])
+        if scaled_bound - loss >= target:
+            core.append(i)
+        elif position < critical:
+            fixed.append(i)
+            stats['fixed_in'] += 1
+        else:
+            stats['fixed_out'] += 1
+
+    # The projects fixed in are a prefix of the LP solution,
+    # so they always fit the budget together:
+    fixed_cost: int = sum(costs[i] for i in fixed)
+    cost_gcd: int = math.gcd(*(costs[i] for i in core)) or 1
+    return PBPresolved(
+        budget=(budget - fixed_cost) // cost_gcd,
+        projects=[projects[i] for i in core],
+        costs=[costs[i] // cost_gcd for i in core],
+        utilities=[utilities[i] for i in core],
+        fixed_projects=[projects[i] for i in fixed],
+        fixed_utility=sum(utilities[i] for i in fixed),
+        incumbent=incumbent,
+        incumbent_utility=incumbent_utility,
+        stats=stats
+    )
+
+
+def postsolve(
+        presolved: PBPresolved,
+        allocation: List[int],
+        utility: int
+) -> Tuple[List[int], int]:
+    """
+    Maps an allocation of the core problem back to the original problem.
+
+    Parameters:
+        - presolved (PBPresolved): The result of presolve.
+        - allocation (List[int]): The allocation of the core problem, as a list of project ids.
+        - utility (int): The utility of the allocation of the core problem.
+
+    Returns:
+        - Tuple[List[int], int]: The better of the core allocation together with the fixed
+        projects, and the incumbent, as a list of project ids and its overall value.
+    """
+
+    if utility + presolved.fixed_utility >= presolved.incumbent_utility:
+        return presolved.fixed_projects + allocation, utility + presolved.fixed_utility
+    return presolved.incumbent, presolved.incumbent_utility
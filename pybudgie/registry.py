@@ -0,0 +1,208 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import importlib
+
+
+@dataclass
+class PBAlgorithmSpec:
+    # The name of the algorithm, which PBSolver.solve accepts
+    # in place of a PBAlgorithm, e.g., 'SIMULATED_ANNEALING':
+    name: str
+
+    # A function returning the solver, which is called with the budget,
+    # projects, costs, utilities and the parameters below, and returns the
+    # allocation, as a list of project ids, and its utility. It is only
+    # called the first time the algorithm is used, such that the module of
+    # the solver, and e.g. NumPy, is only imported then:
+    loader: Callable[[], Callable]
+
+    # The parameters passed to the solver and their defaults. The parameters
+    # of PBSolver.solve of the same name, e.g., deadline, progress, stats or
+    # epsilon, override the defaults, as do the options of PBSolver.solve:
+    parameters: Dict[str, Any] = field(default_factory=dict)
+
+    # A function of the parameters returning the guaranteed fraction of the
+    # optimal utility, e.g., 1.0 for exact algorithms, or None if there is
+    # no guarantee:
+    approximation_bound: Optional[Callable[[Dict[str, Any]], float]] = None
+
+    # The solver, once it has been loaded:
+    solver: Optional[Callable] = field(default=None, repr=False)
+
+    def load(self) -> Callable:
+        """
+        Returns:
+            - Callable: The solver, which is loaded on the first call.
+        """
+        if self.solver is None:
+            self.solver = self.loader()
+        return self.solver
+
+
+# The registered algorithms, by name:
+__registry: Dict[str, PBAlgorithmSpec] = {}
+
+
+def register(
+        name: str,
+        loader: Callable[[], Callable],
+        parameters: Dict[str, Any] = None,
+        approximation_bound: Callable[[Dict[str, Any]], float] = None,
+        replace: bool = False
+) -> PBAlgorithmSpec:
+    """
+    Registers an algorithm, such that PBSolver.solve, the portfolio and solve_many
+    accept its name in place of a PBAlgorithm. Third-party algorithms register
+    themselves in the same way as the built-in algorithms, e.g.:
+
+        register('MY_SOLVER', lambda: my_package.my_solver, {'deadline': None})
+
+    Parameters:
+        - name (str): The name of the algorithm.
+        - loader (Callable[[], Callable]): A function returning the solver, see PBAlgorithmSpec.
+        - parameters (Dict[str, Any]): The parameters of the solver and their defaults.
+        - approximation_bound (Callable[[Dict[str, Any]], float]): An optional function of
+        the parameters returning the approximation bound of the algorithm.
+        - replace (bool): Whether to replace an algorithm already registered under the name.
+
+    Returns:
+        - PBAlgorithmSpec: The registered algorithm.
+    """
+
+    if name in __registry and not replace:
+        raise ValueError(f'An algorithm named {name!r} is already registered.')
+
+    spec: PBAlgorithmSpec = PBAlgorithmSpec(name, loader, dict(parameters or {}), approximation_bound)
+    __registry[name] = spec
+    return spec
+
+
+def get(name: str) -> PBAlgorithmSpec:
+    """
+    Parameters:
+        - name (str): The name of the algorithm.
+
+    Returns:
+        - PBAlgorithmSpec: The registered algorithm.
+    """
+    if name not in __registry:
+        raise ValueError(f'No algorithm named {name!r} is registered.')
+    return __registry[name]
+
+
+def names() -> List[str]:
+    """
+    Returns:
+        - List[str]: The names of the registered algorithms, in order of registration.
+    """
+    return list(__registry)
+
+
+def __solver(module: str, function: str) -> Callable[[], Callable]:
+    """
+    Parameters:
+        - module (str): The module of the solver, relative to pybudgie.algorithms.
+        - function (str): The name of the solver in the module.
+
+    Returns:
+        - Callable[[], Callable]: A loader which imports the module and returns the solver.
+    """
+    return lambda: getattr(importlib.import_module(f'.algorithms.{module}', __package__), function)
+
+
+def __load_dynamic_programming() -> Callable:
+    """
+    Returns:
+        - Callable: A solver which fills the smaller of the dynamic programming tables
+        with the NumPy engine, unless another engine of dynamic_programming_solver is
+        chosen with vectorized or linear_memory.
+    """
+    from .algorithms.dyn_prog import dynamic_programming_solver, min_cost_dynamic_programming_solver, table_columns
+
+    def solver(
+            budget: int,
+            projects: List[int],
+            costs: List[int],
+            utilities: List[int],
+            vectorized: bool = True,
+            linear_memory: bool = False,
+            deadline=None
+    ):
+        if vectorized and not linear_memory and table_columns(budget, costs, utilities)[1]:
+            return min_cost_dynamic_programming_solver(budget, projects, costs, utilities, deadline=deadline)
+        return dynamic_programming_solver(
+            budget, projects, costs, utilities,
+            vectorized=vectorized, linear_memory=linear_memory, deadline=deadline
+        )
+
+    return solver
+
+
+def __exact(parameters: Dict[str, Any]) -> float:
+    return 1.0
+
+
+register('GREEDY', __solver('greedy', 'greedy_solver'))
+
+register('RATIO_GREEDY', __solver('greedy', 'ratio_greedy_solver'))
+
+register('SIMULATED_ANNEALING', __solver('sim_anneal', 'simulated_annealing_solver'), {
+    'initial_temperature': 10.0,
+    'temperature_length': 1,
+    'cooling_ratio': 0.999,
+    'num_non_improve': 100_000,
+    'deadline': None,
+    'chains': 1,
+    'swap_probability': 0.3,
+    'drop_add_probability': 0.1,
+    'progress': None
+})
+
+register('GENETIC_ALGORITHM', __solver('genetic', 'genetic_algorithm_solver'), {
+    'population_size': 1000,
+    'mutation_rate': 0.3,
+    'crossover_rate': 0.8,
+    'num_generations': 250,
+    'deadline': None,
+    'vectorized': True,
+    'islands': 1,
+    'migration_interval': 10,
+    'migration_size': 5,
+    'repair': True,
+    'elitism': 10,
+    'stagnation_limit': 50
+})
+
+register('DYNAMIC_PROGRAMMING', __load_dynamic_programming, {
+    'vectorized': True,
+    'linear_memory': False,
+    'deadline': None
+}, __exact)
+
+register('BRANCH_AND_BOUND', __solver('branch_bound', 'branch_and_bound_solver'), {
+    'max_queue_size': 100_000,
+    'tighter_bound': False,
+    'stats': None,
+    'deadline': None,
+    'workers': 1,
+    'progress': None
+}, __exact)
+
+register('PARETO_FRONTIER', __solver('pareto', 'pareto_frontier_solver'), {
+    'deadline': None
+}, __exact)
+
+register('FPTAS', __solver('fptas', 'fptas_solver'), {
+    'epsilon': 0.1,
+    'deadline': None
+}, lambda parameters: 1.0 - parameters['epsilon'])
+
+register('PARALLEL_TEMPERING', __solver('sim_anneal', 'parallel_tempering_solver'), {
+    'replicas': 16,
+    'min_temperature': None,
+    'max_temperature': None,
+    'swap_interval': 10,
+    'num_non_improve': 100_000,
+    'deadline': None,
+    'progress': None
+})
@@ -1,5 +1,10 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Union, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .solver import PBAlgorithm
+    from .cost_model import PBEstimate
 
 
 @dataclass
@@ -8,3 +13,43 @@ class PBResult:
     utility: int
     runtime_ms: float
 
+    # The guaranteed fraction of the optimal utility, e.g., 1.0
+    # for exact algorithms, or None if there is no guarantee:
+    approximation_bound: Optional[float] = None
+
+    # Any statistics recorded by the algorithm, e.g., the number
+    # of nodes expanded by branch and bound:
+    stats: Dict[str, int] = field(default_factory=dict)
+
+    # Whether the algorithm ran to completion, rather than
+    # being cut short by the time limit:
+    finished: bool = True
+
+    # The algorithm which found the allocation, e.g., the
+    # winner of PBAlgorithm.PORTFOLIO, or the name of a registered
+    # algorithm which is not a PBAlgorithm:
+    algorithm: Optional[Union['PBAlgorithm', str]] = None
+
+    # The estimated runtime and memory of the algorithm selected
+    # by PBAlgorithm.AUTO:
+    estimate: Optional['PBEstimate'] = None
+
+    # Whether the result was served from a PBResultCache, in which
+    # case runtime_ms is the time taken to look it up:
+    cached: bool = False
+
+
+@dataclass
+class PBSweepResult:
+    budgets: List[int]
+
+    # The result for each budget, in the same order:
+    results: List[PBResult]
+
+    # The runtime of the whole sweep, which is shared
+    # between the results:
+    runtime_ms: float
+
+    # The optimal utility for every budget {0, 1, ..., max(budgets)},
+    # or None if the algorithm does not compute it:
+    curve: Optional['np.ndarray'] = None
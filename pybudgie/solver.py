@@ -1,20 +1,28 @@
 from .instance import PBInstance
 from .project import PBProject
 from .voter import PBVoter
-from .algorithms import greedy_solver, \
-    ratio_greedy_solver, \
-    simulated_annealing_solver, \
-    genetic_algorithm_solver, \
-    dynamic_programming_solver, \
-    branch_and_bound_solver
-from .result import PBResult
+from .algorithms import Deadline
+from .result import PBResult, PBSweepResult
+from .cost_model import PBEstimate, estimate, select
+from .presolve import PBPresolved, postsolve, presolve as run_presolve
+from .cache import PBResultCache
+from . import registry
         
 
 from timeit import default_timer as timer
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional, Iterable, Iterator, AsyncIterator, Callable, \
+    Union, Any, TYPE_CHECKING
 from collections import defaultdict
 from enum import Enum
+import os
 import logging
+import queue
+
+# NumPy, multiprocessing and asyncio are only imported by
+# the functions which use them, to keep imports fast:
+if TYPE_CHECKING:
+    import multiprocessing
+    import numpy as np
 
 
 class PBAlgorithm(Enum):
@@ -24,6 +32,40 @@ class PBAlgorithm(Enum):
     GENETIC_ALGORITHM = 3
     DYNAMIC_PROGRAMMING = 4
     BRANCH_AND_BOUND = 5
+    PARETO_FRONTIER = 6
+    FPTAS = 7
+    PARALLEL_TEMPERING = 8
+    PORTFOLIO = 9
+    AUTO = 10
+
+
+# The algorithms raced by PBAlgorithm.PORTFOLIO, unless
+# another portfolio is provided:
+DEFAULT_PORTFOLIO: List[PBAlgorithm] = [
+    PBAlgorithm.GREEDY,
+    PBAlgorithm.SIMULATED_ANNEALING,
+    PBAlgorithm.GENETIC_ALGORITHM,
+    PBAlgorithm.BRANCH_AND_BOUND
+]
+
+# How long the portfolio waits after the deadline for the
+# algorithms to report their best allocations so far:
+PORTFOLIO_GRACE_MS: float = 100
+
+# The deterministic algorithms, whose results are cached when
+# they run to completion:
+CACHED_ALGORITHMS: List[PBAlgorithm] = [
+    PBAlgorithm.GREEDY,
+    PBAlgorithm.RATIO_GREEDY,
+    PBAlgorithm.DYNAMIC_PROGRAMMING,
+    PBAlgorithm.BRANCH_AND_BOUND,
+    PBAlgorithm.PARETO_FRONTIER,
+    PBAlgorithm.FPTAS
+]
+
+# How long a cancelled worker process of PBSolver.solve_stream
+# has to stop cooperatively before it is terminated:
+CANCEL_GRACE_MS: float = 1_000
 
 
 class PBWelfare(Enum):
@@ -76,100 +118,899 @@ class PBWelfare(Enum):
         return flattened
 
 
+def _resolve(algorithm: Union[PBAlgorithm, str]) -> Union[PBAlgorithm, str]:
+    """
+    Parameters:
+        - algorithm (Union[PBAlgorithm, str]): A PBAlgorithm, or the name of a registered algorithm.
+
+    Returns:
+        - Union[PBAlgorithm, str]: The PBAlgorithm of that name if there is one, e.g., for
+        'SIMULATED_ANNEALING', and otherwise the name of the registered algorithm.
+    """
+    if isinstance(algorithm, str) and algorithm in PBAlgorithm.__members__:
+        return PBAlgorithm[algorithm]
+    return algorithm
+
+
+def _validate(algorithm: Union[PBAlgorithm, str], options: Dict[str, Any] = None) -> None:
+    """
+    Checks that a single algorithm is registered, and that it accepts the options.
+    The options of PBAlgorithm.PORTFOLIO and PBAlgorithm.AUTO are passed to whichever
+    algorithms accept them, so they are not checked.
+
+    Parameters:
+        - algorithm (Union[PBAlgorithm, str]): The algorithm, see _resolve.
+        - options (Dict[str, Any]): The options of the algorithm, if any.
+    """
+
+    if algorithm in (PBAlgorithm.PORTFOLIO, PBAlgorithm.AUTO):
+        return
+
+    spec: registry.PBAlgorithmSpec = registry.get(
+        algorithm.name if isinstance(algorithm, PBAlgorithm) else algorithm
+    )
+    unknown: List[str] = [name for name in options or {} if name not in spec.parameters]
+    if unknown:
+        raise ValueError(f'{spec.name} does not accept the options {unknown}.')
+
+
+def _dispatch(
+        algorithm: Union[PBAlgorithm, str],
+        budget: int,
+        projects: List[str],
+        costs: List[int],
+        utilities: List[int],
+        deadline: Deadline,
+        stats: Dict[str, int],
+        options: Dict[str, Any] = None,
+        **parameters
+) -> Tuple[List[str], int, Optional[float]]:
+    """
+    Runs a single registered algorithm on the flattened instance, see PBSolver.solve
+    for the parameters. This only needs the flattened lists, so it can run in a worker.
+    The solver receives the defaults of its parameter schema, see pybudgie.registry,
+    overridden by the parameters and options of the same name. For example, simulated
+    annealing, parallel tempering and branch and bound receive progress.
+
+    Returns:
+        - Tuple[List[str], int, Optional[float]]: The allocation found, as a list of
+        project ids, its overall value, and the approximation bound of the algorithm.
+    """
+
+    spec: registry.PBAlgorithmSpec = registry.get(
+        algorithm.name if isinstance(algorithm, PBAlgorithm) else algorithm
+    )
+
+    arguments: Dict[str, Any] = dict(spec.parameters)
+    for name, value in dict(parameters, deadline=deadline, stats=stats, **(options or {})).items():
+        if name in arguments:
+            arguments[name] = value
+
+    approximation_bound: float = None
+    if spec.approximation_bound is not None:
+        approximation_bound = spec.approximation_bound(arguments)
+    if approximation_bound == 1.0:
+        logging.warning(f'{spec.name.replace("_", " ").capitalize()} is an exact algorithm and may take a long time!')
+
+    allocation, utility = spec.load()(
+        budget=budget,
+        projects=projects,
+        costs=costs,
+        utilities=utilities,
+        **arguments
+    )
+
+    return allocation, utility, approximation_bound
+
+
+def _run_portfolio_member(
+        index: int,
+        results: 'multiprocessing.Queue',
+        **parameters
+) -> None:
+    """
+    Runs a single algorithm of the portfolio in a worker process, and sends its
+    allocation, utility, approximation bound and statistics to the results queue,
+    or None if the algorithm failed.
+
+    Parameters:
+        - index (int): The index of the algorithm in the portfolio.
+        - results (multiprocessing.Queue): The queue to which the result is sent.
+        - parameters: The parameters of _dispatch.
+    """
+
+    stats: Dict[str, int] = {}
+    try:
+        allocation, utility, approximation_bound = _dispatch(stats=stats, **parameters)
+    except Exception:
+        logging.exception(f'{parameters["algorithm"]} failed in the portfolio.')
+        results.put((index, None))
+        return
+
+    results.put((index, (allocation, utility, approximation_bound, stats)))
+
+
+def _race(
+        portfolio: List[PBAlgorithm],
+        deadline: Deadline,
+        **parameters
+) -> Tuple[List[str], int, Optional[float], Dict[str, int], Optional[PBAlgorithm]]:
+    """
+    Runs every algorithm of the portfolio concurrently, each in its own worker
+    process on the same flattened instance, and returns the best allocation
+    reported by the deadline. As soon as an exact algorithm finishes, it has
+    proven its allocation optimal, so the remaining workers are stopped. Each
+    algorithm runs in a single process, i.e., with one worker and one island.
+
+    Parameters:
+        - portfolio (List[PBAlgorithm]): The algorithms to race.
+        - deadline (Deadline): The deadline, which the workers check cooperatively.
+        - parameters: The remaining parameters of _dispatch.
+
+    Returns:
+        - Tuple[List[str], int, Optional[float], Dict[str, int], Optional[PBAlgorithm]]:
+        The allocation, utility, approximation bound and statistics of the best result,
+        and the algorithm which found it, or None if no algorithm reported in time.
+    """
+
+    import multiprocessing
+
+    parameters.update(workers=1, islands=1, deadline=deadline)
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    processes: List[multiprocessing.Process] = [
+        multiprocessing.Process(
+            target=_run_portfolio_member,
+            args=(index, results),
+            kwargs=dict(parameters, algorithm=algorithm),
+            daemon=True
+        )
+        for index, algorithm in enumerate(portfolio)
+    ]
+    for process in processes:
+        process.start()
+
+    best: tuple = ([], 0, None, {}, None)
+    pending: int = len(processes)
+
+    while pending > 0:
+        try:
+            index, outcome = results.get(timeout=0.05)
+        except queue.Empty:
+            # We stop waiting once the grace period after the deadline
+            # has passed, or if every worker has exited:
+            if deadline.end_time is not None and timer() > deadline.end_time + PORTFOLIO_GRACE_MS / 1_000:
+                break
+            if not any(process.is_alive() for process in processes):
+                break
+            if deadline.cancelled is not None and deadline.cancelled.is_set():
+                break
+            continue
+
+        pending -= 1
+        if outcome is None:
+            continue
+
+        # An exact algorithm that finished before the deadline has
+        # found the optimum, whereas one that was cut short has not:
+        allocation, utility, approximation_bound, stats = outcome
+        optimal: bool = approximation_bound == 1.0 and not deadline.expired()
+        if best[4] is None or utility > best[1] or optimal:
+            best = (allocation, utility, approximation_bound, stats, portfolio[index])
+
+        if optimal:
+            break
+
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+    return best
+
+
+def _auto(
+        deadline: Deadline,
+        memory_limit_bytes: int,
+        parameters: dict
+) -> Tuple[PBAlgorithm, PBEstimate]:
+    """
+    Selects an algorithm for PBAlgorithm.AUTO with the cost model, using the time
+    until the deadline as the latency target. The estimate is of the instance as it
+    is passed to the algorithm, i.e., the core problem if presolve is enabled.
+
+    Parameters:
+        - deadline (Deadline): The deadline of the solve, if any.
+        - memory_limit_bytes (int): The memory available to the algorithm in bytes.
+        - parameters (dict): The parameters of _dispatch.
+
+    Returns:
+        - Tuple[PBAlgorithm, PBEstimate]: The selected algorithm and its estimate.
+    """
+
+    time_limit_ms: float = None
+    if deadline.end_time is not None:
+        time_limit_ms = max(deadline.end_time - timer(), 0) * 1_000
+
+    chosen: PBEstimate = select(
+        estimate(
+            budget=parameters['budget'],
+            costs=parameters['costs'],
+            utilities=parameters['utilities'],
+            epsilon=parameters.get('epsilon', 0.1)
+        ),
+        time_limit_ms=time_limit_ms,
+        memory_limit_bytes=memory_limit_bytes
+    )
+    return PBAlgorithm[chosen.algorithm], chosen
+
+
+def _solve_flattened(
+        algorithm: Union[PBAlgorithm, str],
+        start_time: float,
+        deadline: Deadline,
+        portfolio: List[Union[PBAlgorithm, str]] = None,
+        memory_limit_bytes: int = None,
+        presolve: bool = True,
+        progress: Callable[[List[str], int], None] = None,
+        **parameters
+) -> PBResult:
+    """
+    Solves a flattened instance with a single algorithm or a portfolio, and wraps
+    the allocation in a PBResult, see PBSolver.solve for the parameters.
+
+    Parameters:
+        - start_time (float): The time from which to measure the runtime.
+        - progress (Callable[[List[str], int], None]): An optional function called with
+        each new best allocation of the algorithm, mapped back to the original instance,
+        and its utility. The portfolio does not report its members' allocations.
+        - parameters: The remaining parameters of _dispatch.
+
+    Returns:
+        - PBResult: The result of the algorithm.
+    """
+
+    # The greedy algorithms are left as they are, since
+    # presolve compares against a greedy allocation anyway:
+    presolved: PBPresolved = None
+    if presolve and algorithm not in (PBAlgorithm.GREEDY, PBAlgorithm.RATIO_GREEDY):
+        presolved = run_presolve(
+            budget=parameters['budget'],
+            projects=parameters['projects'],
+            costs=parameters['costs'],
+            utilities=parameters['utilities']
+        )
+        parameters.update(
+            budget=presolved.budget,
+            projects=presolved.projects,
+            costs=presolved.costs,
+            utilities=presolved.utilities
+        )
+
+    # We map the allocations reported by the algorithm back to the
+    # original instance, and only pass on strict improvements:
+    if progress is not None and presolved is not None:
+        report = progress
+        reported: List[int] = [-1]
+
+        def progress(allocation: List[str], utility: int) -> None:
+            allocation, utility = postsolve(presolved, allocation, utility)
+            if utility > reported[0]:
+                reported[0] = utility
+                report(allocation, utility)
+
+    chosen: PBEstimate = None
+    if algorithm == PBAlgorithm.AUTO:
+        algorithm, chosen = _auto(deadline, memory_limit_bytes, parameters)
+
+    if algorithm == PBAlgorithm.PORTFOLIO:
+        allocation, utility, approximation_bound, stats, algorithm = _race(
+            portfolio=[_resolve(member) for member in portfolio or DEFAULT_PORTFOLIO],
+            deadline=deadline,
+            **parameters
+        )
+    else:
+        stats: Dict[str, int] = {}
+        allocation, utility, approximation_bound = _dispatch(
+            algorithm=algorithm,
+            deadline=deadline,
+            stats=stats,
+            progress=progress,
+            **parameters
+        )
+
+    if presolved is not None:
+        allocation, utility = postsolve(presolved, allocation, utility)
+        stats.update({f'presolve_{key}': value for key, value in presolved.stats.items()})
+
+    end_time = timer()
+    runtime_ms: float = (end_time - start_time) * 1_000
+
+    # An algorithm that was cut short has no guarantee. Worker processes
+    # check their own copy of the deadline, so we check it here too:
+    if deadline.expired():
+        approximation_bound = None
+
+    return PBResult(allocation, utility, runtime_ms, approximation_bound, stats, not deadline.reached, algorithm, chosen)
+
+
+def _solve_task(
+        algorithm: Union[PBAlgorithm, str],
+        time_limit_ms: float,
+        **parameters
+) -> PBResult:
+    """
+    Solves a flattened instance in a worker of solve_many, where the time limit
+    starts when the worker picks up the instance.
+
+    Parameters:
+        - algorithm (Union[PBAlgorithm, str]): The algorithm to use.
+        - time_limit_ms (float): An optional time limit in milliseconds.
+        - parameters: The remaining parameters of _solve_flattened.
+
+    Returns:
+        - PBResult: The result of the algorithm.
+    """
+    return _solve_flattened(algorithm, timer(), Deadline(time_limit_ms), **parameters)
+
+
+def _cache_key(
+        cache: Optional[PBResultCache],
+        algorithm: Union[PBAlgorithm, str],
+        budget: int,
+        projects: List[str],
+        costs: List[int],
+        utilities: List[int],
+        parameters: dict
+) -> Optional[str]:
+    """
+    Parameters:
+        - cache (Optional[PBResultCache]): The cache of the solver, if any.
+        - algorithm (Union[PBAlgorithm, str]): The algorithm to use.
+        - budget (int): The total budget of the instance.
+        - projects (List[str]): The flattened project ids.
+        - costs (List[int]): The flattened costs.
+        - utilities (List[int]): The flattened utilities.
+        - parameters (dict): The remaining parameters of PBSolver.solve.
+
+    Returns:
+        - Optional[str]: The key of the result in the cache, or None if there is
+        no cache or the algorithm is not in CACHED_ALGORITHMS.
+    """
+
+    if cache is None or algorithm not in CACHED_ALGORITHMS:
+        return None
+
+    # Only epsilon, presolve and the options change the result of
+    # a deterministic algorithm which runs to completion:
+    return PBResultCache.key(
+        budget, projects, costs, utilities, algorithm.name,
+        epsilon=parameters.get('epsilon', 0.1) if algorithm == PBAlgorithm.FPTAS else None,
+        presolve=parameters.get('presolve', True),
+        options=sorted((parameters.get('options') or {}).items())
+    )
+
+
+def _cached(
+        cache: Optional[PBResultCache],
+        key: Optional[str],
+        start_time: float
+) -> Optional[PBResult]:
+    """
+    Parameters:
+        - cache (Optional[PBResultCache]): The cache of the solver, if any.
+        - key (Optional[str]): The key of the result, see _cache_key.
+        - start_time (float): The time from which to measure the runtime.
+
+    Returns:
+        - Optional[PBResult]: A copy of the cached result, whose runtime is the time
+        taken to look it up, or None if there is none.
+    """
+
+    if key is None:
+        return None
+
+    result: PBResult = cache.get(key)
+    if result is not None:
+        result.runtime_ms = (timer() - start_time) * 1_000
+        result.cached = True
+    return result
+
+
+def _solve_streaming(
+        send: Callable[[tuple], None],
+        **parameters
+) -> None:
+    """
+    Solves a flattened instance in the worker of PBSolver.solve_stream, sending
+    ('progress', allocation, utility) for each new best allocation, and finally
+    ('result', PBResult), or ('error', exception) if the algorithm failed.
+
+    Parameters:
+        - send (Callable[[tuple], None]): The function which sends each event.
+        - parameters: The parameters of _solve_flattened.
+    """
+
+    try:
+        result: PBResult = _solve_flattened(
+            progress=lambda allocation, utility: send(('progress', allocation, utility)),
+            **parameters
+        )
+    except Exception as exception:
+        send(('error', exception))
+        return
+    send(('result', result))
+
+
+def _receive(events: 'multiprocessing.Queue', process: 'multiprocessing.Process') -> tuple:
+    """
+    Parameters:
+        - events (multiprocessing.Queue): The queue of events from the worker process.
+        - process (multiprocessing.Process): The worker process.
+
+    Returns:
+        - tuple: The next event from the worker process, or an error event if the
+        process has exited without sending its result.
+    """
+
+    while True:
+        try:
+            return events.get(timeout=0.05)
+        except queue.Empty:
+            if not process.is_alive():
+                break
+
+    # The process may have sent its last events
+    # just before it exited:
+    try:
+        return events.get(timeout=0.05)
+    except queue.Empty:
+        return 'error', RuntimeError(f'The worker process exited with code {process.exitcode}.')
+
+
+def _stop(process: 'multiprocessing.Process') -> None:
+    """
+    Waits for a cancelled worker process to stop cooperatively, and terminates it
+    if it has not stopped within CANCEL_GRACE_MS.
+
+    Parameters:
+        - process (multiprocessing.Process): The worker process.
+    """
+
+    process.join(CANCEL_GRACE_MS / 1_000)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+
+
 class PBSolver:
-    def __init__(self, instance: PBInstance):
+    def __init__(self, instance: PBInstance, cache: PBResultCache = None):
+        """
+        Constructs a PBSolver object for an instance.
+
+        Parameters:
+            - instance (PBInstance): The instance to solve.
+            - cache (PBResultCache): An optional cache, which may be shared between solvers,
+            of the results of the deterministic algorithms in CACHED_ALGORITHMS. A repeat
+            solve of an identical flattened instance then returns the cached result.
+        """
+
         self.instance: PBInstance = instance
+        self.cache: Optional[PBResultCache] = cache
+
+    def _flatten(self, maximise_welfare: PBWelfare) -> Tuple[List[str], List[int], List[int]]:
+        """
+        Parameters:
+            - maximise_welfare (PBWelfare): The welfare function to be maximised.
+
+        Returns:
+            - Tuple[List[str], List[int], List[int]]: The project ids, costs and
+            flattened utilities of the instance, as three separate lists for solving.
+        """
+
+        # The instance keeps the utilitarian totals up to date
+        # as voters are added, so we need not flatten again:
+        if maximise_welfare == PBWelfare.UTILITARIAN:
+            return self.instance.tallies()
+
+        # Flatten the individual voter utilities into a one-dimension:
+        flattened: Dict[str, int] = maximise_welfare.flatten(
+            voters=self.instance.voters,
+            projects=self.instance.projects
+        )
+
+        # Convert the instance into three separate lists for solving:
+        projects: List[str] = [project for project in flattened.keys()]
+        costs: List[int] = [self.instance.get_project(project_id).cost for project_id in flattened.keys()]
+        utilities: List[int] = [project for project in flattened.values()]
+        return projects, costs, utilities
     
-    def solve(self, algorithm: PBAlgorithm, maximise_welfare: PBWelfare) -> PBResult:
+    def solve(
+            self,
+            algorithm: Union[PBAlgorithm, str],
+            maximise_welfare: PBWelfare,
+            epsilon: float = 0.1,
+            time_limit_ms: float = None,
+            workers: int = 1,
+            islands: int = 1,
+            migration_interval: int = 10,
+            migration_size: int = 5,
+            portfolio: List[Union[PBAlgorithm, str]] = None,
+            memory_limit_bytes: int = None,
+            presolve: bool = True,
+            options: Dict[str, Any] = None
+    ) -> PBResult:
         """
         Finds an allocation for the participatory budgeting instance using the provided algorithm
         to maximise the provided welfare function.
 
         Parameters:
-            - algorithm (PBAlgorithm): The algorithm to use to find the allocation by maximising
-            the welfare function, e.g., PBAlgorithm.GREEDY, PBAlgorithm.GENETIC_ALGORITHM, etc.
+            - algorithm (Union[PBAlgorithm, str]): The algorithm to use to find the allocation by
+            maximising the welfare function, e.g., PBAlgorithm.GREEDY, PBAlgorithm.GENETIC_ALGORITHM,
+            etc., or the name of an algorithm in pybudgie.registry, e.g., 'GREEDY' or a third-party
+            algorithm.
             - maximise_welfare (PBWelfare): The welfare function to be maximised in finding
             the allocation, e.g., PBWelfare.UTILITARIAN.
+            - epsilon (float): The approximation parameter of PBAlgorithm.FPTAS, which is
+            guaranteed to find an allocation with at least (1 - epsilon) of the optimal utility.
+            - time_limit_ms (float): An optional time limit in milliseconds, including the time
+            to flatten the instance. Every algorithm except the greedy algorithms, which always
+            finish quickly, checks the deadline cooperatively and returns the best allocation
+            found so far. PBResult.finished records whether the algorithm was cut short.
+            - workers (int): The number of worker processes for PBAlgorithm.BRANCH_AND_BOUND.
+            - islands (int): The number of island populations, each in its own process, for
+            PBAlgorithm.GENETIC_ALGORITHM. One means a single population without migration.
+            - migration_interval (int): The number of generations between island migrations.
+            - migration_size (int): The number of chromosomes migrating from each island.
+            - portfolio (List[Union[PBAlgorithm, str]]): The algorithms which PBAlgorithm.PORTFOLIO runs
+            concurrently in worker processes, returning the best allocation by the deadline.
+            Defaults to DEFAULT_PORTFOLIO. PBResult.algorithm records which algorithm won.
+            - memory_limit_bytes (int): The memory available to PBAlgorithm.AUTO, which selects
+            the fastest algorithm estimated to fit this and the time limit. Defaults to half of
+            the physical memory. PBResult.algorithm and PBResult.estimate record the decision.
+            - presolve (bool): Whether to reduce the instance before solving it, by removing
+            projects that cannot be funded or add no utility, fixing projects in or out of the
+            allocation, and dividing the costs by their GCD, see pybudgie.presolve. The greedy
+            algorithms are never presolved.
+            - options (Dict[str, Any]): Parameters of the algorithm which override the defaults of
+            its parameter schema in pybudgie.registry, e.g., {'population_size': 500}.
 
         Returns:
             - Tuple[List[int], int]: A pair containing the allocation found, as a list of project
             ids, and the overall value with regard to the welfare function.
         """
 
-        # TODO: Rethink the flattening function, i.e., do we want it to
-        # return a dictionary which we need to process further?
-        # Do we want to do this every time we call this function?
+        start_time = timer()
+        deadline: Deadline = Deadline(time_limit_ms)
+
+        algorithm = _resolve(algorithm)
+        _validate(algorithm, options)
+
+        projects, costs, utilities = self._flatten(maximise_welfare)
+
+        # A deterministic algorithm which ran to completion finds
+        # the same allocation again, so we look it up first:
+        key: Optional[str] = _cache_key(
+            self.cache, algorithm, self.instance.budget, projects, costs, utilities,
+            dict(epsilon=epsilon, presolve=presolve, options=options)
+        )
+        cached: PBResult = _cached(self.cache, key, start_time)
+        if cached is not None:
+            return cached
+
+        result: PBResult = _solve_flattened(
+            algorithm=algorithm,
+            start_time=start_time,
+            deadline=deadline,
+            budget=self.instance.budget,
+            projects=projects,
+            costs=costs,
+            utilities=utilities,
+            portfolio=portfolio,
+            memory_limit_bytes=memory_limit_bytes,
+            presolve=presolve,
+            epsilon=epsilon,
+            workers=workers,
+            islands=islands,
+            migration_interval=migration_interval,
+            migration_size=migration_size,
+            options=options
+        )
+
+        if key is not None and result.finished:
+            self.cache.put(key, result)
+        return result
+
+    async def solve_async(
+            self,
+            algorithm: Union[PBAlgorithm, str],
+            maximise_welfare: PBWelfare,
+            executor: str = 'thread',
+            time_limit_ms: float = None,
+            **parameters
+    ) -> PBResult:
+        """
+        Finds an allocation like solve, but without blocking the event loop, by running
+        the algorithm in a worker thread or process, see solve_stream for the parameters.
+        If the awaiting task is cancelled, then the algorithm is stopped as well.
+
+        Returns:
+            - PBResult: The result of the algorithm.
+        """
+
+        result: PBResult = None
+        async for result in self.solve_stream(algorithm, maximise_welfare, executor, time_limit_ms, **parameters):
+            pass
+        return result
+
+    async def solve_stream(
+            self,
+            algorithm: Union[PBAlgorithm, str],
+            maximise_welfare: PBWelfare,
+            executor: str = 'thread',
+            time_limit_ms: float = None,
+            **parameters
+    ) -> AsyncIterator[PBResult]:
+        """
+        Finds an allocation like solve in a worker thread or process, and yields each new
+        best allocation as the algorithm finds it, such that a service can serve a good
+        allocation early. Simulated annealing, parallel tempering and branch and bound
+        report their best allocations as they improve, and every algorithm reports its
+        final result. The intermediate results are unfinished and have no statistics.
+
+        Cancelling the consuming task, or closing the iterator, e.g., with
+        contextlib.aclosing, cancels the deadline, such that the algorithm stops at
+        its next cooperative check. A worker process which does not stop within
+        CANCEL_GRACE_MS is terminated.
+
+        Parameters:
+            - algorithm (Union[PBAlgorithm, str]): The algorithm to use, see solve.
+            - maximise_welfare (PBWelfare): The welfare function to be maximised, see solve.
+            - executor (str): Either 'thread', which runs the algorithm in the default executor
+            of the event loop, or 'process', which runs it in its own worker process. Threads
+            start immediately, but the pure Python algorithms hold the GIL for most of their
+            run, whereas a process leaves the event loop entirely free.
+            - time_limit_ms (float): An optional time limit in milliseconds, see solve.
+            - parameters: Any further parameters of solve, e.g., epsilon.
+
+        Returns:
+            - AsyncIterator[PBResult]: The results for each new best allocation, where the
+            last is the final result of the algorithm.
+        """
+
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"The executor must be 'thread' or 'process', not {executor!r}.")
+
+        import asyncio
+        import multiprocessing
 
         start_time = timer()
+        algorithm = _resolve(algorithm)
+        _validate(algorithm, parameters.get('options'))
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        projects, costs, utilities = self._flatten(maximise_welfare)
 
-        # Flatten the individual voter utilities into a one-dimension:
-        flattened: Dict[str, int] = maximise_welfare.flatten(
-            voters=self.instance.voters,
-            projects=self.instance.projects
+        key: Optional[str] = _cache_key(
+            self.cache, algorithm, self.instance.budget, projects, costs, utilities, parameters
         )
+        cached: PBResult = _cached(self.cache, key, start_time)
+        if cached is not None:
+            yield cached
+            return
 
-        # Convert the instance into three separate lists for solving:
-        projects: List[str] = [project for project in flattened.keys()]
-        costs: List[int] = [self.instance.get_project(project_id).cost for project_id in flattened.keys()]
-        utilities: List[int] = [project for project in flattened.values()]
+        task: dict = dict(
+            parameters,
+            algorithm=algorithm,
+            start_time=start_time,
+            budget=self.instance.budget,
+            projects=projects,
+            costs=costs,
+            utilities=utilities
+        )
 
-        allocation: List[int] = []
-        utility: int = 0
+        # The event is a multiprocessing.Event in either case, since even
+        # in a thread, the portfolio, islands or branch and bound workers
+        # may run in processes which must see the cancellation:
+        cancelled = multiprocessing.Event()
+        process: multiprocessing.Process = None
+        if executor == 'thread':
+            events: asyncio.Queue = asyncio.Queue()
 
-        # Compute the result using the provided algorithm:
-        if algorithm == PBAlgorithm.GREEDY:
-            allocation, utility = greedy_solver(
-                budget=self.instance.budget,
-                projects=projects,
-                costs=costs,
-                utilities=utilities
-            )
-        
-        if algorithm == PBAlgorithm.RATIO_GREEDY:
-            allocation, utility = ratio_greedy_solver(
-                budget=self.instance.budget,
-                projects=projects,
-                costs=costs,
-                utilities=utilities
-            )
+            def send(event: tuple) -> None:
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(events.put_nowait, event)
 
-        if algorithm == PBAlgorithm.SIMULATED_ANNEALING:
-            allocation, utility = simulated_annealing_solver(
-                budget=self.instance.budget,
-                projects=projects,
-                costs=costs,
-                utilities=utilities
+            loop.run_in_executor(None, lambda: _solve_streaming(
+                send, deadline=Deadline(time_limit_ms, cancelled), **task
+            ))
+            receive = events.get
+        else:
+            events: multiprocessing.Queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_solve_streaming,
+                args=(events.put,),
+                kwargs=dict(task, deadline=Deadline(time_limit_ms, cancelled))
             )
+            process.start()
+            receive = lambda: loop.run_in_executor(None, _receive, events, process)
 
-        if algorithm == PBAlgorithm.GENETIC_ALGORITHM:
-            allocation, utility = genetic_algorithm_solver(
-                budget=self.instance.budget,
-                projects=projects,
-                costs=costs,
-                utilities=utilities,
-                population_size=1000,
-                num_generations=250
-            )
+        try:
+            while True:
+                event: tuple = await receive()
+                if event[0] == 'error':
+                    raise event[1]
+                if event[0] == 'result':
+                    if key is not None and event[1].finished:
+                        self.cache.put(key, event[1])
+                    yield event[1]
+                    return
+
+                _, allocation, utility = event
+                runtime_ms: float = (timer() - start_time) * 1_000
+                yield PBResult(allocation, utility, runtime_ms, None, {}, False, algorithm)
+
+        finally:
+            # We stop the algorithm if it is still running, e.g.,
+            # because the consumer was cancelled:
+            cancelled.set()
+            if process is not None:
+                loop.run_in_executor(None, _stop, process)
+
+    def solve_budgets(
+            self,
+            budgets: List[int],
+            algorithm: PBAlgorithm,
+            maximise_welfare: PBWelfare,
+            time_limit_ms: float = None
+    ) -> PBSweepResult:
+        """
+        Finds an allocation for each of several budgets, e.g., 80%, 90%, 100% and 110%
+        of the instance budget, from a single shared computation rather than a call to
+        solve for each budget.
+
+        Parameters:
+            - budgets (List[int]): The budgets for which to find allocations.
+            - algorithm (PBAlgorithm): The algorithm to use, which must be one of
+            PBAlgorithm.GREEDY, PBAlgorithm.RATIO_GREEDY, which sort the candidates
+            once, or PBAlgorithm.DYNAMIC_PROGRAMMING, which fills a single table for
+            the largest budget and also returns the curve of optimal utilities.
+            - maximise_welfare (PBWelfare): The welfare function to be maximised in finding
+            the allocations, e.g., PBWelfare.UTILITARIAN.
+            - time_limit_ms (float): An optional time limit in milliseconds for
+            PBAlgorithm.DYNAMIC_PROGRAMMING, see solve.
+
+        Returns:
+            - PBSweepResult: The result for each budget, and the curve of optimal
+            utilities for PBAlgorithm.DYNAMIC_PROGRAMMING.
+        """
+
+        if algorithm not in (PBAlgorithm.GREEDY, PBAlgorithm.RATIO_GREEDY, PBAlgorithm.DYNAMIC_PROGRAMMING):
+            raise ValueError(f'{algorithm} does not support solving for several budgets.')
+
+        if not budgets or min(budgets) < 0:
+            raise ValueError('The budgets must be a non-empty list of non-negative integers.')
+
+        from .algorithms import dynamic_programming_budget_sweep, greedy_budget_sweep, table_columns
+
+        start_time = timer()
+        deadline: Deadline = Deadline(time_limit_ms)
+        projects, costs, utilities = self._flatten(maximise_welfare)
+
+        approximation_bound: float = None
+        curve: np.ndarray = None
 
         if algorithm == PBAlgorithm.DYNAMIC_PROGRAMMING:
             logging.warning('Dynamic programming is an exact algorithm and may take a long time!')
-            allocation, utility = dynamic_programming_solver(
-                budget=self.instance.budget,
+            allocations, curve = dynamic_programming_budget_sweep(
+                budgets=budgets,
                 projects=projects,
                 costs=costs,
-                utilities=utilities
+                utilities=utilities,
+                min_cost=table_columns(max(budgets), costs, utilities)[1],
+                deadline=deadline
             )
 
-        if algorithm == PBAlgorithm.BRANCH_AND_BOUND:
-            logging.warning('Branch and bound is an exact algorithm and may take a long time!')
-            allocation, utility = branch_and_bound_solver(
-                budget=self.instance.budget,
+            # The allocations are only optimal if the table was filled:
+            if not deadline.reached:
+                approximation_bound = 1.0
+        else:
+            allocations = greedy_budget_sweep(
+                budgets=budgets,
                 projects=projects,
                 costs=costs,
-                utilities=utilities
+                utilities=utilities,
+                ratio=algorithm == PBAlgorithm.RATIO_GREEDY
             )
 
         end_time = timer()
         runtime_ms: float = (end_time - start_time) * 1_000
 
-        return PBResult(allocation, utility, runtime_ms)
+        results: List[PBResult] = [
+            PBResult(allocation, utility, runtime_ms, approximation_bound, {}, not deadline.reached, algorithm)
+            for allocation, utility in allocations
+        ]
+        return PBSweepResult(list(budgets), results, runtime_ms, curve)
+
+
+def solve_many(
+        instances: Iterable[PBInstance],
+        algorithm: Union[PBAlgorithm, str],
+        maximise_welfare: PBWelfare,
+        workers: int = None,
+        time_limit_ms: float = None,
+        cache: PBResultCache = None,
+        **parameters
+) -> Iterator[Tuple[int, PBResult]]:
+    """
+    Solves many participatory budgeting instances over a pool of worker processes,
+    yielding each result as soon as it is complete. The instances are flattened one
+    at a time in this process, and only the flattened project ids, costs, utilities
+    and budget are sent to the workers. At most two instances per worker are in flight,
+    so the instances may be a generator over a corpus that does not fit in memory.
+
+    Parameters:
+        - instances (Iterable[PBInstance]): The instances to solve, which are consumed
+        lazily as the workers become free.
+        - algorithm (Union[PBAlgorithm, str]): The algorithm to use for every instance, see PBSolver.solve.
+        - maximise_welfare (PBWelfare): The welfare function to be maximised.
+        - workers (int): The number of worker processes, which defaults to the number
+        of processors. Each algorithm runs in a single process within its worker.
+        - time_limit_ms (float): An optional time limit in milliseconds for each instance,
+        which starts when a worker picks up the instance.
+        - cache (PBResultCache): An optional cache, see PBSolver. Cached results are
+        yielded without being sent to a worker.
+        - parameters: Any further parameters of PBSolver.solve, e.g., epsilon.
+
+    Returns:
+        - Iterator[Tuple[int, PBResult]]: Pairs of the index of each instance in
+        instances and its result, in the order in which they complete.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+
+    algorithm = _resolve(algorithm)
+    _validate(algorithm, parameters.get('options'))
+    workers = workers or os.cpu_count() or 1
+    parameters.update(workers=1)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight: Dict[Future, Tuple[int, Optional[str]]] = {}
+        indexed_instances = enumerate(instances)
+
+        while True:
+            # Top up the instances in flight, flattening each
+            # instance only just before it is submitted:
+            for index, instance in indexed_instances:
+                start_time = timer()
+                projects, costs, utilities = PBSolver(instance)._flatten(maximise_welfare)
+                key: Optional[str] = _cache_key(
+                    cache, algorithm, instance.budget, projects, costs, utilities, parameters
+                )
+                cached: PBResult = _cached(cache, key, start_time)
+                if cached is not None:
+                    yield index, cached
+                    continue
+
+                future: Future = executor.submit(
+                    _solve_task,
+                    algorithm=algorithm,
+                    time_limit_ms=time_limit_ms,
+                    budget=instance.budget,
+                    projects=projects,
+                    costs=costs,
+                    utilities=utilities,
+                    **parameters
+                )
+                in_flight[future] = (index, key)
+                if len(in_flight) >= 2 * workers:
+                    break
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, key = in_flight.pop(future)
+                result: PBResult = future.result()
+                if key is not None and result.finished:
+                    cache.put(key, result)
+                yield index, result